@@ -18,7 +18,8 @@ import logging
 
 from core.embeddings import generate_embedding
 from core.chroma_client import search_candidates
-from services.match_score import cosine_similarity, generate_reason
+from core.similarity import cosine_similarities
+from services.match_score import generate_reason
 from services.email import generate_candidate_email, generate_hr_email
 
 # Configure logging
@@ -93,7 +94,8 @@ def retrieve_candidates(state: AgentState) -> Dict[str, Any]:
 
     try:
         logger.info("Searching for similar candidates in vector database")
-        results = search_candidates(state["jd_embedding"], n_results=5)
+        # match_and_score re-scores against the stored vectors, so ask Chroma to return them
+        results = search_candidates(state["jd_embedding"], n_results=5, include=["metadatas", "distances", "embeddings"])
 
         # Extract candidates from ChromaDB results
         ids = results.get("ids", [[]])[0]
@@ -142,11 +144,12 @@ def match_and_score(state: AgentState) -> Dict[str, Any]:
         jd_embedding = state["jd_embedding"]
         matches = []
 
-        for candidate in state["candidates"]:
+        # Score every candidate against the JD in one matmul
+        similarities = cosine_similarities(jd_embedding, [c["embedding"] for c in state["candidates"]])
+
+        for candidate, sim in zip(state["candidates"], similarities):
             try:
-                # Calculate similarity score
-                sim = cosine_similarity(jd_embedding, candidate["embedding"])
-                score = round(sim * 100, 2)
+                score = round(float(sim) * 100, 2)
 
                 # Generate AI-powered reasoning
                 reason = generate_reason(
@@ -332,9 +335,10 @@ def get_workflow_status() -> Dict[str, Any]:
     jd_embedding = state["jd_embedding"]
     matches = []
 
-    for c in state["candidates"]:
-        sim = cosine_similarity(jd_embedding, c["embedding"])
-        score = round(sim * 100, 2)
+    similarities = cosine_similarities(jd_embedding, [c["embedding"] for c in state["candidates"]])
+
+    for c, sim in zip(state["candidates"], similarities):
+        score = round(float(sim) * 100, 2)
 
         reason = generate_reason(
             state["jd_text"],
@@ -0,0 +1,91 @@
+"""
+Parity and throughput check: ONNX embedding backends against the torch reference.
+
+Encodes the same synthetic candidate/JD corpus with every backend, reports
+texts/sec and resident memory growth, and the cosine similarity of each ONNX
+vector to its torch counterpart. Exits non-zero if any vector drifts further
+than --max-drift (1 - cosine) from the torch reference.
+
+Usage (from backend/):
+    python -m benchmarks.embedding_backend_parity --texts 512 --max-drift 0.02
+"""
+
+import argparse
+import random
+import resource
+import sys
+import time
+
+import numpy as np
+
+from core.embedding_backends import create_backend
+
+SKILLS = ["Python", "Java", "React", "TypeScript", "Machine Learning", "AWS", "Kubernetes", "Docker",
+          "Spring Boot", "Pandas", "NLP", "SQL", "Microservices", "UI/UX", "CI/CD", "TensorFlow"]
+
+
+def synthetic_corpus(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    texts = []
+    for i in range(n):
+        skills = ", ".join(rng.sample(SKILLS, rng.randint(2, 6)))
+        if i % 4 == 0:
+            texts.append(f"We are hiring an engineer with {rng.randint(1, 10)}+ years of experience in {skills}. "
+                         "You will design, build and operate production services with a collaborative team.")
+        else:
+            texts.append(f"Candidate {i} skills: {skills} experience: {rng.randint(0, 15)} years")
+    return texts
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(kind: str, model_name: str, quantize: bool, texts: list, batch_size: int) -> tuple:
+    rss_before = rss_mb()
+    backend = create_backend(kind, model_name, quantize=quantize)
+    backend.encode(texts[:batch_size], batch_size=batch_size)  # warm up
+    start = time.perf_counter()
+    vectors = backend.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return backend.name, vectors, {
+        "texts_per_s": round(len(texts) / elapsed, 1),
+        "peak_rss_growth_mb": round(rss_mb() - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-drift", type=float, default=0.02, help="largest allowed 1 - cosine vs torch")
+    args = parser.parse_args()
+
+    texts = synthetic_corpus(args.texts)
+    # ONNX first so its peak RSS is not masked by torch's
+    runs = [run_backend("onnx", args.model, quantize, texts, args.batch_size) for quantize in (False, True)]
+    reference_name, reference, reference_stats = run_backend("torch", args.model, False, texts, args.batch_size)
+    print({"backend": reference_name, **reference_stats})
+
+    failed = False
+    for name, vectors, stats in runs:
+        cosines = np.sum(vectors * reference, axis=1) / (
+            np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1)
+        )
+        drift = float(1 - cosines.min())
+        failed |= drift > args.max_drift
+        print({
+            "backend": name,
+            **stats,
+            "speedup_vs_torch": round(stats["texts_per_s"] / reference_stats["texts_per_s"], 2),
+            "cosine_min": round(float(cosines.min()), 5),
+            "cosine_mean": round(float(cosines.mean()), 5),
+            "max_drift": round(drift, 5),
+            "within_bound": drift <= args.max_drift,
+        })
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
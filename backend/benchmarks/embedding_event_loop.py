@@ -0,0 +1,103 @@
+"""
+Benchmark: latency of `/` while embedding requests are in flight.
+
+Runs the same tiny app twice in-process, once encoding directly inside the
+async handler (the old behaviour) and once through the async embedding
+facade, and reports p50/p99 latency of `/` under concurrent embedding load.
+
+Usage (from backend/):
+    python -m benchmarks.embedding_event_loop --concurrency 8 --requests 64
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI
+
+from core.embeddings import generate_embedding, agenerate_embedding
+
+
+def build_app(offload: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def root():
+        return {"message": "Hello, World!", "datetime": datetime.now()}
+
+    @app.post("/embed")
+    async def embed():
+        # Unique text so every request pays for a forward pass instead of hitting the cache
+        text = f"benchmark candidate {uuid.uuid4()} skills: Python, Machine Learning " * 8
+        if offload:
+            embedding = await agenerate_embedding(text)
+        else:
+            embedding = generate_embedding(text)
+        return {"dimension": len(embedding)}
+
+    return app
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(offload: bool, concurrency: int, total_requests: int, probe_interval: float) -> dict:
+    transport = httpx.ASGITransport(app=build_app(offload))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = total_requests
+        done = asyncio.Event()
+
+        async def embed_worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await client.post("/embed")
+
+        async def probe(latencies: list):
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(probe_interval)
+
+        latencies = []
+        probe_task = asyncio.create_task(probe(latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(embed_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        "mode": "offloaded" if offload else "inline",
+        "embed_requests": total_requests,
+        "wall_s": round(elapsed, 2),
+        "root_samples": len(latencies),
+        "root_p50_ms": round(statistics.median(latencies), 2),
+        "root_p99_ms": round(percentile(latencies, 99), 2),
+        "root_max_ms": round(max(latencies), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="seconds between `/` probes")
+    args = parser.parse_args()
+
+    # Warm the model so load time is not attributed to either mode
+    generate_embedding("warm up")
+    for offload in (False, True):
+        print(asyncio.run(run(offload, args.concurrency, args.requests, args.probe_interval)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: sweep Chroma HNSW parameters against exact search.
+
+Builds one Chroma collection per (space, M, ef_construction, ef_search)
+combination over a synthetic clustered corpus and reports index build
+time, query p50/p99 and recall@k against exact cosine neighbours. Every
+setting gets a fresh build: Chroma only honours ef_search given at creation.
+Use it to choose CHROMA_HNSW_M / _EF_CONSTRUCTION / _EF_SEARCH (and their
+per-collection overrides) for a given corpus size.
+
+Usage (from backend/):
+    python -m benchmarks.hnsw_sweep --size 50000 --m 8 16 32 --ef-construction 100 200 --ef-search 10 50 100 200
+"""
+
+import argparse
+import itertools
+import tempfile
+
+from benchmarks.vector_search import synthetic_corpus, synthetic_queries, exact_neighbors, load_store, evaluate_store
+from core.vector_store import ChromaVectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--space", nargs="+", default=["cosine"], choices=["l2", "cosine", "ip"])
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 50, 100, 200])
+    args = parser.parse_args()
+
+    import chromadb
+
+    # Unit-length vectors rank identically in every space, so one exact ground truth serves all of them
+    corpus = synthetic_corpus(args.size, args.dim)
+    queries = synthetic_queries(corpus, args.queries)
+    truth = exact_neighbors(corpus, queries, args.k)
+
+    with tempfile.TemporaryDirectory() as root:
+        client = chromadb.PersistentClient(path=root)
+        settings = itertools.product(args.space, args.m, args.ef_construction, args.ef_search)
+        for i, (space, m, ef_construction, ef_search) in enumerate(settings):
+            hnsw = {"space": space, "max_neighbors": m, "ef_construction": ef_construction, "ef_search": ef_search}
+            store = ChromaVectorStore(client.create_collection(name=f"sweep_{i}", configuration={"hnsw": hnsw}))
+            row = {"space": space, "M": m, "ef_construction": ef_construction, "ef_search": ef_search,
+                   "build_s": round(load_store(store, corpus), 2)}
+            row.update(evaluate_store(store, queries, truth, args.k))
+            print(row)
+            client.delete_collection(f"sweep_{i}")
+
+
+if __name__ == "__main__":
+    main()
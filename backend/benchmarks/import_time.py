@@ -0,0 +1,85 @@
+"""
+Startup guard: profile `import main` and fail on regressions.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, prints
+the slowest top-level imports, and exits non-zero if the total exceeds
+--max-seconds or if any heavy model library (torch, transformers,
+sentence_transformers, sklearn, onnxruntime) is imported at startup. Those
+must only load lazily, on first use or during the background warm-up.
+
+Usage (from backend/):
+    python -m benchmarks.import_time --max-seconds 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "sklearn", "onnxruntime"]
+
+
+def profile_imports(module: str) -> list:
+    env = dict(os.environ)
+    # main.py creates tables on import; point it at a throwaway database unless one is configured
+    env.setdefault("DATABASE_CONNECTION_STRING", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'import_time.db')}")
+    env["WARMUP_ON_STARTUP"] = "false"
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.exit(f"`import {module}` failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # The name column is one space plus two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--max-seconds", type=float, default=5.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    # importtime prints children before their parent: the module's direct imports are
+    # the depth-1 rows between its own row and the previous top-level row
+    index = max(i for i, r in enumerate(rows) if r[0] == args.module and r[3] == 0)
+    total = rows[index][2] / 1e6
+    direct = []
+    for row in reversed(rows[:index]):
+        if row[3] == 0:
+            break
+        if row[3] == 1:
+            direct.append(row)
+    direct.sort(key=lambda r: r[2], reverse=True)
+
+    print(f"{'cumulative_ms':>14}  module")
+    for name, _, cumulative_us, _ in direct[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+    imported = {r[0] for r in rows}
+    heavy = [m for m in HEAVY_MODULES if m in imported]
+    print({"total_s": round(total, 3), "budget_s": args.max_seconds, "heavy_imports": heavy})
+
+    failures = []
+    if total > args.max_seconds:
+        failures.append(f"import of {args.module} took {total:.2f}s (budget {args.max_seconds}s)")
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy)}")
+    if failures:
+        sys.exit("; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: LLM tokens and round trips per match, single vs batched scoring,
+with and without the hybrid-score LLM shortlist.
+
+Runs match_jd_to_candidates in both scoring modes against a fake chat model
+that answers either prompt format, and reports the token usage recorded by
+core.llm_invoke (the same counters served at /metrics/llm). The fake model
+reports no usage, so tokens use the ~4 characters per token estimate; the
+ratio between modes is what matters.
+
+Usage (from backend/):
+    python -m benchmarks.match_scoring_tokens --n-results 25 --batch-size 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+from types import SimpleNamespace
+
+# services.match_score pulls in db.db, which needs a connection string at import time
+os.environ.setdefault("DATABASE_CONNECTION_STRING", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+# Every call must reach the model to be counted
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from core import llm, llm_invoke
+from services import match_score
+from benchmarks.match_scoring_concurrency import install_fakes
+
+JD_TEXT = "Senior machine learning engineer. " * 60
+
+
+class FakeChatModel:
+    async def ainvoke(self, messages):
+        prompt = messages[-1].content
+        ids = re.findall(r"candidate_id: (\S+),", prompt)
+        if ids:
+            content = json.dumps([{"candidate_id": cid, "score": random.randint(40, 95), "reason": "synthetic"} for cid in ids])
+        else:
+            content = f"Score: {random.randint(40, 95)}% Reason: synthetic benchmark response"
+        return SimpleNamespace(content=content)
+
+
+def run(mode: str, n_results: int, batch_size: int, shortlist_size: int = 0) -> dict:
+    llm_invoke._token_usage.clear()
+    asyncio.run(match_score.match_jd_to_candidates("bench", n_results, mode=mode, batch_size=batch_size, shortlist_size=shortlist_size))
+    usage = llm_invoke.get_llm_token_stats()
+    calls = sum(entry["calls"] for entry in usage.values())
+    input_tokens = sum(entry["input_tokens"] for entry in usage.values())
+    output_tokens = sum(entry["output_tokens"] for entry in usage.values())
+    return {"mode": mode, "shortlist_size": shortlist_size or None, "llm_calls": calls, "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "tokens_per_candidate": round((input_tokens + output_tokens) / n_results, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n-results", type=int, default=25)
+    parser.add_argument("--batch-size", type=int, default=match_score.MATCH_SCORING_BATCH_SIZE)
+    parser.add_argument("--shortlist-size", type=int, default=match_score.MATCH_LLM_SHORTLIST_SIZE)
+    args = parser.parse_args()
+
+    install_fakes(latency=0, jitter=0)
+    # Score through the real invoke_llm so its token counters see every call
+    match_score.invoke_llm = llm_invoke.invoke_llm
+    match_score.get_jd_by_title = lambda title, db=None: SimpleNamespace(id=None, job_description=JD_TEXT)
+    llm.get_llm = lambda provider=None, model=None: FakeChatModel()
+
+    single = run("single", args.n_results, args.batch_size)
+    batched = run("batched", args.n_results, args.batch_size)
+    print(single)
+    print({**batched, "batch_size": args.batch_size})
+    print({"input_token_reduction": round(1 - batched["input_tokens"] / single["input_tokens"], 3)})
+    print(run("single", args.n_results, args.batch_size, args.shortlist_size))
+    print({**run("batched", args.n_results, args.batch_size, args.shortlist_size), "batch_size": args.batch_size})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: per-pair cosine_similarity loop vs vectorized similarity + top-k.
+
+Scores one JD vector (and a batch of JD vectors) against a random candidate
+matrix at several pool sizes, comparing the old one-call-per-candidate loop
+with core.similarity's single normalized matmul, and argsort with
+argpartition for top-k selection.
+
+Candidate matrices are float32 and normalized in place; 1M x 384 needs ~1.5 GB.
+
+Usage (from backend/):
+    python -m benchmarks.similarity_topk --sizes 1000 100000 1000000 --k 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# services.match_score pulls in db.db, which needs a connection string at import time
+os.environ.setdefault("DATABASE_CONNECTION_STRING", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from core.similarity import cosine_similarities, normalize_rows, top_k
+from services.match_score import cosine_similarity
+
+
+def best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=16, help="JD vectors in the batched run")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--loop-max", type=int, default=100000, help="skip the per-pair loop above this size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    query = normalize_rows(rng.standard_normal(args.dim, dtype=np.float32))
+    queries = normalize_rows(rng.standard_normal((args.queries, args.dim), dtype=np.float32))
+
+    for size in args.sizes:
+        candidates = normalize_rows(rng.standard_normal((size, args.dim), dtype=np.float32), copy=False)
+        scores = cosine_similarities(query, candidates, normalized=True)
+        row = {"candidates": size}
+
+        if size <= args.loop_max:
+            row["per_pair_loop_ms"] = round(best_of(lambda: [cosine_similarity(query, c) for c in candidates], 1) * 1000, 2)
+        row["matmul_ms"] = round(best_of(lambda: cosine_similarities(query, candidates, normalized=True), args.repeats) * 1000, 2)
+        row[f"matmul_{args.queries}_queries_ms"] = round(
+            best_of(lambda: cosine_similarities(queries, candidates, normalized=True), args.repeats) * 1000, 2)
+        row["argsort_topk_ms"] = round(best_of(lambda: np.argsort(-scores)[:args.k], args.repeats) * 1000, 2)
+        row["argpartition_topk_ms"] = round(best_of(lambda: top_k(scores, args.k), args.repeats) * 1000, 2)
+        assert (np.sort(scores[top_k(scores, args.k)]) == np.sort(scores[np.argsort(-scores)[:args.k]])).all()
+        print(row)
+        del candidates, scores
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Shared harness for vector-store benchmarks.
+
+Builds a synthetic, clustered corpus of unit-length embeddings (real
+sentence embeddings cluster by role and skill set, which is what makes
+approximate indexes both fast and lossy), computes exact neighbours for a
+query set, and measures any VectorStore's build time, per-query latency
+percentiles and recall@k against that ground truth.
+
+Not a benchmark by itself; see benchmarks.vector_store_backends.
+"""
+
+import time
+
+import numpy as np
+
+from core.similarity import normalize_rows, search
+
+
+def synthetic_corpus(size: int, dim: int = 384, clusters: int = 64, spread: float = 0.35, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.standard_normal((clusters, dim), dtype=np.float32), copy=False)
+    corpus = centers[rng.integers(0, clusters, size)]
+    corpus += spread * rng.standard_normal((size, dim), dtype=np.float32) / np.sqrt(dim)
+    return normalize_rows(corpus, copy=False)
+
+# Queries near (but not on) random corpus points, like a JD close to some candidates
+def synthetic_queries(corpus: np.ndarray, n: int, noise: float = 0.3, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    queries = corpus[rng.integers(0, len(corpus), n)].copy()
+    queries += noise * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(corpus.shape[1])
+    return normalize_rows(queries, copy=False)
+
+# Ground-truth top-k row indices per query by exact cosine (== squared L2 order on unit vectors)
+def exact_neighbors(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    indices, _ = search(queries, corpus, k, normalized=True)
+    return indices
+
+def recall_at_k(found: list, truth: list, k: int) -> float:
+    hits = sum(len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth))
+    return hits / (k * len(truth)) if truth else 0.0
+
+def percentile_ms(latencies: list, q: float) -> float:
+    return round(float(np.percentile(latencies, q)) * 1000, 3)
+
+def load_store(store, corpus: np.ndarray, batch_size: int = 5000) -> float:
+    """Insert the corpus as ids "0".."n-1" in batches; returns seconds taken."""
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), batch_size):
+        batch = corpus[offset:offset + batch_size]
+        ids = [str(i) for i in range(offset, offset + len(batch))]
+        store.add(ids=ids, embeddings=batch, metadatas=None)
+    return time.perf_counter() - start
+
+def evaluate_store(store, queries: np.ndarray, truth: np.ndarray, k: int, batch: int = 16) -> dict:
+    """
+    Query latency (one query per call) and recall@k against `truth`.
+
+    Also times `batch` queries sent in one query_batch call, the shape used
+    when several JDs are matched at once.
+    """
+    latencies, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = store.query(query.tolist(), n_results=k, include=["distances"])
+        latencies.append(time.perf_counter() - start)
+        found.append([int(i) for i in result["ids"][0]])
+
+    batch_queries = queries[:batch].tolist()
+    start = time.perf_counter()
+    store.query_batch(batch_queries, n_results=k, include=["distances"])
+    batch_s = time.perf_counter() - start
+
+    return {
+        "query_p50_ms": percentile_ms(latencies, 50),
+        "query_p99_ms": percentile_ms(latencies, 99),
+        f"batch_{len(batch_queries)}_ms": round(batch_s * 1000, 3),
+        f"recall@{k}": round(recall_at_k(found, truth.tolist(), k), 4)
+    }
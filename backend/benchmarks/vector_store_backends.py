@@ -0,0 +1,59 @@
+"""
+Benchmark: Chroma (HNSW) vs the exact NumPy vector store.
+
+Loads the same synthetic clustered corpus into a fresh Chroma collection and
+a memory-mapped NumpyVectorStore (both in a temporary directory), then
+reports load time, single-query p50/p99, one batched query, and recall@k
+against exact search for each corpus size. The NumPy store is exact, so its
+recall is 1.0 by construction; the interesting numbers are the latency
+crossover and how much recall HNSW gives up.
+
+A 100k x 384 corpus is ~150 MB of float32 per store.
+
+Usage (from backend/):
+    python -m benchmarks.vector_store_backends --sizes 10000 100000 --k 10
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.vector_search import synthetic_corpus, synthetic_queries, exact_neighbors, load_store, evaluate_store
+from core.vector_store import NumpyVectorStore, ChromaVectorStore
+
+
+def make_stores(root: str, backends: list) -> list:
+    stores = []
+    if "numpy" in backends:
+        stores.append(NumpyVectorStore(os.path.join(root, "numpy")))
+    if "chroma" in backends:
+        import chromadb
+
+        client = chromadb.PersistentClient(path=os.path.join(root, "chroma"))
+        stores.append(ChromaVectorStore(client.get_or_create_collection(name="benchmark")))
+    return stores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=["numpy", "chroma"], choices=["numpy", "chroma"])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        corpus = synthetic_corpus(size, args.dim)
+        queries = synthetic_queries(corpus, args.queries)
+        truth = exact_neighbors(corpus, queries, args.k)
+        with tempfile.TemporaryDirectory() as root:
+            for store in make_stores(root, args.backends):
+                row = {"backend": store.name, "corpus": size, "load_s": round(load_store(store, corpus), 2)}
+                row.update(evaluate_store(store, queries, truth, args.k))
+                print(row)
+                del store
+
+
+if __name__ == "__main__":
+    main()
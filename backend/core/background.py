@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedTaskPool:
+    """
+    Runs keyed background coroutines, at most `max_workers` at a time.
+
+    Submitting a key that is already queued or running cancels the older task,
+    so only the latest version of a piece of work survives. At most
+    `max_pending` tasks (queued plus running) are held; further submissions
+    are rejected rather than queued without bound.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._tasks = {}
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    async def _run(self, key, factory, state: dict):
+        try:
+            async with self._semaphore:
+                state["started"] = True
+                await factory()
+            self.completed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Background task {key!r} failed: {str(e)}")
+        finally:
+            entry = self._tasks.get(key)
+            if entry and entry[0] is asyncio.current_task():
+                del self._tasks[key]
+
+    # Schedule `factory()` under `key`; must be called from a running event loop
+    def submit(self, key, factory) -> bool:
+        self.cancel(key)
+        if len(self._tasks) >= self.max_pending:
+            self.rejected += 1
+            return False
+        state = {"started": False}
+        self._tasks[key] = (asyncio.ensure_future(self._run(key, factory, state)), state)
+        self.submitted += 1
+        return True
+
+    def cancel(self, key) -> bool:
+        entry = self._tasks.pop(key, None)
+        if entry is None or entry[0].done():
+            return False
+        # Counted here: a task cancelled before it first runs never reaches _run
+        entry[0].cancel()
+        self.cancelled += 1
+        return True
+
+    def cancel_all(self):
+        for key in list(self._tasks):
+            self.cancel(key)
+
+    async def wait(self, key, timeout: float) -> bool:
+        """
+        Let a running task for `key` finish (up to `timeout` seconds).
+
+        A task still waiting for a worker is cancelled instead, since the
+        caller is about to do the same work itself. Returns True when the
+        task completed.
+        """
+        entry = self._tasks.get(key)
+        if entry is None:
+            return False
+        task, state = entry
+        if not state["started"]:
+            self.cancel(key)
+            return False
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        return task in done and not task.cancelled()
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": sum(1 for _, state in self._tasks.values() if not state["started"]),
+            "running": sum(1 for _, state in self._tasks.values() if state["started"]),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed
+        }
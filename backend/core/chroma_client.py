@@ -1,54 +1,281 @@
-import chromadb
+import os
+import logging
+import threading
 
-client = chromadb.PersistentClient(path="./chroma_db")
-jd_collection = client.get_or_create_collection(name="job_descriptions")
-candidate_collection = client.get_or_create_collection(name="candidates")
+from dotenv import load_dotenv
+
+from core.vector_store import VectorStore, ChromaVectorStore, NumpyVectorStore, create_vector_store
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Vector store holding JD and candidate embeddings: "chroma" or "numpy" (exact, in-process)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma").lower()
+# "embedded" opens CHROMA_PERSIST_DIR in-process; "http" talks to a Chroma server, which lets
+# several uvicorn workers share one store without contending on its SQLite/HNSW files
+CHROMA_CLIENT_MODE = os.getenv("CHROMA_CLIENT_MODE", "embedded").lower()
+CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
+CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+CHROMA_SSL = os.getenv("CHROMA_SSL", "false").lower() == "true"
+CHROMA_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("CHROMA_HTTP_CONNECT_TIMEOUT_SECONDS", "3"))
+CHROMA_HTTP_TIMEOUT_SECONDS = float(os.getenv("CHROMA_HTTP_TIMEOUT_SECONDS", "15"))
+# Pooled keep-alive connections per worker process
+CHROMA_HTTP_MAX_CONNECTIONS = int(os.getenv("CHROMA_HTTP_MAX_CONNECTIONS", "20"))
+CHROMA_HTTP_KEEPALIVE_SECONDS = float(os.getenv("CHROMA_HTTP_KEEPALIVE_SECONDS", "40"))
+# Retries of a request that failed on a transient transport error (http mode only)
+CHROMA_HTTP_RETRIES = int(os.getenv("CHROMA_HTTP_RETRIES", "2"))
+# Directory of the numpy store's memory-mapped matrices; empty keeps it in memory only
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "./vector_store")
+
+# HNSW index of new collections. Downstream code treats distances as cosine, so that is the default
+# space; each setting can be overridden per collection, e.g. CHROMA_HNSW_EF_SEARCH_CANDIDATES=200
+CHROMA_HNSW_SPACE = os.getenv("CHROMA_HNSW_SPACE", "cosine").lower()
+CHROMA_HNSW_M = int(os.getenv("CHROMA_HNSW_M", "16"))
+CHROMA_HNSW_EF_CONSTRUCTION = int(os.getenv("CHROMA_HNSW_EF_CONSTRUCTION", "100"))
+CHROMA_HNSW_EF_SEARCH = int(os.getenv("CHROMA_HNSW_EF_SEARCH", "100"))
+# Records copied per round trip by migrate_collection
+CHROMA_MIGRATION_BATCH_SIZE = int(os.getenv("CHROMA_MIGRATION_BATCH_SIZE", "1000"))
+
+JD_COLLECTION = "job_descriptions"
+CANDIDATE_COLLECTION = "candidates"
+
+# Parameters fixed when an HNSW index is built; changing them means rebuilding the collection.
+# Chroma accepts ef_search in modify(), but an index that already exists keeps searching with its
+# original value, so it is treated as fixed too.
+_IMMUTABLE_HNSW = ("space", "max_neighbors", "ef_construction", "ef_search")
+
+_client = None
+_stores = {}
+_lock = threading.Lock()
+
+def _http_client():
+    import chromadb
+    import httpx
+    from chromadb.config import Settings
+
+    settings = Settings(
+        anonymized_telemetry=False,
+        chroma_http_keepalive_secs=CHROMA_HTTP_KEEPALIVE_SECONDS,
+        chroma_http_max_connections=CHROMA_HTTP_MAX_CONNECTIONS,
+        chroma_http_max_keepalive_connections=CHROMA_HTTP_MAX_CONNECTIONS
+    )
+    client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT, ssl=CHROMA_SSL, settings=settings)
+    # chromadb builds its pooled httpx session without timeouts; bound every request
+    session = getattr(getattr(client, "_server", None), "_session", None)
+    if session is not None:
+        session.timeout = httpx.Timeout(CHROMA_HTTP_TIMEOUT_SECONDS, connect=CHROMA_HTTP_CONNECT_TIMEOUT_SECONDS)
+    return client
+
+# One client per process, created lazily so each forked uvicorn worker opens its own connections
+def _chroma_client():
+    global _client
+    if _client is None:
+        if CHROMA_CLIENT_MODE == "http":
+            _client = _http_client()
+        elif CHROMA_CLIENT_MODE == "embedded":
+            import chromadb
+
+            _client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+        else:
+            raise ValueError(f"Unknown CHROMA_CLIENT_MODE '{CHROMA_CLIENT_MODE}' (expected 'embedded' or 'http')")
+    return _client
+
+def _hnsw_setting(setting: str, name: str, default):
+    return type(default)(os.getenv(f"CHROMA_HNSW_{setting}_{name.upper()}", default))
+
+# Configured HNSW parameters of a collection, in Chroma's names
+def hnsw_config(name: str) -> dict:
+    return {
+        "space": _hnsw_setting("SPACE", name, CHROMA_HNSW_SPACE).lower(),
+        "max_neighbors": _hnsw_setting("M", name, CHROMA_HNSW_M),
+        "ef_construction": _hnsw_setting("EF_CONSTRUCTION", name, CHROMA_HNSW_EF_CONSTRUCTION),
+        "ef_search": _hnsw_setting("EF_SEARCH", name, CHROMA_HNSW_EF_SEARCH)
+    }
+
+def _config_drift(store: VectorStore, config: dict) -> list:
+    if not isinstance(store, ChromaVectorStore):
+        return []
+    actual = store.index_config()
+    return [key for key in _IMMUTABLE_HNSW if key in actual and actual[key] != config[key]]
+
+def _collection_names(client) -> set:
+    return {c if isinstance(c, str) else c.name for c in client.list_collections()}
+
+def _recover_migration(client, name: str):
+    """
+    Finish or roll back a migrate_collection that was interrupted.
+
+    The swap renames `<name>` to `<name>__backup`, then `<name>__migrating`
+    (already fully copied and verified) to `<name>`, then drops the backup,
+    so at every point one complete copy exists under a known name.
+    """
+    tmp_name, backup_name = f"{name}__migrating", f"{name}__backup"
+    names = _collection_names(client)
+    if name not in names:
+        # Died between the two renames: the verified copy (or, failing that, the backup) takes the name
+        source = tmp_name if tmp_name in names else backup_name if backup_name in names else None
+        if source is None:
+            return
+        logger.warning(f"Recovering collection '{name}' from interrupted migration ('{source}')")
+        client.get_collection(name=source).modify(name=name)
+        names = _collection_names(client)
+    if backup_name in names:
+        client.delete_collection(backup_name)
+    elif tmp_name in names:
+        # Died while copying: the original is intact and the partial copy is discarded
+        client.delete_collection(tmp_name)
+
+def _open_store(name: str) -> VectorStore:
+    config = hnsw_config(name)
+    client = _chroma_client() if VECTOR_STORE_BACKEND == "chroma" else None
+    if client is not None:
+        _recover_migration(client, name)
+    retries = CHROMA_HTTP_RETRIES if CHROMA_CLIENT_MODE == "http" else 0
+    store = create_vector_store(VECTOR_STORE_BACKEND, name, chroma_client=client, path=VECTOR_STORE_PATH,
+                                retries=retries, hnsw=config)
+    drift = _config_drift(store, config)
+    if drift:
+        logger.warning(f"Collection '{name}' was built with different HNSW {', '.join(drift)} than configured; "
+                       f"it keeps serving with {store.index_config()} until migrate_collection('{name}') rebuilds it")
+    return store
+
+# The store backing a collection, opened on first use so importing this module touches no disk
+def get_store(name: str) -> VectorStore:
+    store = _stores.get(name)
+    if store is None:
+        with _lock:
+            store = _stores.get(name)
+            if store is None:
+                store = _open_store(name)
+                _stores[name] = store
+    return store
+
+# Distance space of a collection's results, without opening it just to ask
+def get_distance_space(name: str) -> str:
+    store = _stores.get(name)
+    return store.space if store is not None else hnsw_config(name)["space"]
+
+# Configured vs actual index parameters of a collection
+def index_status(name: str) -> dict:
+    store = get_store(name)
+    config = hnsw_config(name)
+    return {
+        "backend": store.name,
+        "configured": config if isinstance(store, ChromaVectorStore) else {"space": config["space"]},
+        "actual": store.index_config(),
+        "needs_migration": bool(_config_drift(store, config))
+    }
+
+def migrate_collection(name: str, batch_size: int = CHROMA_MIGRATION_BATCH_SIZE) -> dict:
+    """
+    Rebuild a collection with its configured HNSW parameters.
+
+    Records (ids, embeddings and metadata) are copied page by page into
+    `<name>__migrating`, built with the configured space, M, ef_construction
+    and ef_search. Once the counts match, the old collection is renamed to
+    `<name>__backup`, the copy takes its name and the backup is dropped; an
+    interrupted swap is completed by _recover_migration the next time the
+    collection is opened. Other processes holding the old collection reopen
+    it by name on their next call. Writes made to the collection while this
+    runs are not copied, so pause ingestion first. The numpy backend has no
+    index, so only its distance space is switched.
+    """
+    with _lock:
+        store = _stores.get(name) or _open_store(name)
+        config = hnsw_config(name)
+        if isinstance(store, NumpyVectorStore):
+            store.space = config["space"]
+            _stores[name] = store
+            return {"collection": name, "migrated": False, "index_config": store.index_config()}
+        if not _config_drift(store, config):
+            _stores[name] = store
+            return {"collection": name, "migrated": False, "index_config": store.index_config()}
+
+        client = _chroma_client()
+        _recover_migration(client, name)
+        old = store.collection
+        tmp_name, backup_name = f"{name}__migrating", f"{name}__backup"
+        # Legacy "hnsw:*" metadata keys would conflict with the new configuration
+        metadata = {key: value for key, value in (old.metadata or {}).items() if not key.startswith("hnsw:")}
+        new = ChromaVectorStore(
+            client.create_collection(name=tmp_name, configuration={"hnsw": config}, metadata=metadata or None),
+            retries=store.retries,
+            client=client
+        )
+        copied = 0
+        while True:
+            page = store.get(offset=copied, limit=batch_size, include=["embeddings", "metadatas"])
+            if not page["ids"]:
+                break
+            new.add(ids=page["ids"], embeddings=page["embeddings"], metadatas=page["metadatas"])
+            copied += len(page["ids"])
+        if new.count() != store.count():
+            client.delete_collection(tmp_name)
+            raise RuntimeError(f"Migration of '{name}' copied {new.count()} of {store.count()} records; the original is unchanged")
+
+        old.modify(name=backup_name)
+        new.collection.modify(name=name)
+        client.delete_collection(backup_name)
+        migrated = ChromaVectorStore(client.get_collection(name=name), retries=store.retries, client=client)
+        _stores[name] = migrated
+        logger.info(f"Migrated collection '{name}' ({copied} records) to HNSW {migrated.index_config()}")
+        return {"collection": name, "migrated": True, "records": copied, "index_config": migrated.index_config()}
+
+# Replace the store behind a collection (e.g. an in-memory NumpyVectorStore in tests)
+def set_store(name: str, store: VectorStore):
+    with _lock:
+        _stores[name] = store
+
+def _without_embeddings(result: dict) -> dict:
+    # Remove embeddings to make it JSON serializable
+    if 'embeddings' in result:
+        del result['embeddings']
+    return result
 
 # Job Description functions
 def add_jd(jd_id: str, embedding: list, metadata: dict):
-    jd_collection.add(
-        ids=[jd_id],
-        embeddings=[embedding],
-        metadatas=[metadata]
-    )
+    get_store(JD_COLLECTION).add(ids=[jd_id], embeddings=[embedding], metadatas=[metadata])
 
 def search_jd(query_embedding: list, n_results=3):
-    return jd_collection.query(
-        query_embeddings=[query_embedding],
-        n_results=n_results
-    )
+    return get_store(JD_COLLECTION).query(query_embedding, n_results=n_results)
 
 def get_jd_count():
-    return jd_collection.count()
+    return get_store(JD_COLLECTION).count()
 
 def peek_jds(n=5):
-    result = jd_collection.peek(limit=n)
-    if 'embeddings' in result:
-        del result['embeddings']
-    return result
+    return _without_embeddings(get_store(JD_COLLECTION).peek(limit=n))
 
 # Candidate functions
 def add_candidate(candidate_id: str, embedding: list, metadata: dict):
-    candidate_collection.add(
-        ids=[candidate_id],
-        embeddings=[embedding],
-        metadatas=[metadata]
-    )
+    get_store(CANDIDATE_COLLECTION).add(ids=[candidate_id], embeddings=[embedding], metadatas=[metadata])
 
-def search_candidates(query_embedding: list, n_results=5, where=None):
-    return candidate_collection.query(
-        query_embeddings=[query_embedding],
-        n_results=n_results,
-        where=where
-    )
+# Bulk insert candidates in a single collection write
+def add_candidates(candidate_ids: list, embeddings: list, metadatas: list):
+    if not candidate_ids:
+        return
+    get_store(CANDIDATE_COLLECTION).add(ids=candidate_ids, embeddings=embeddings, metadatas=metadatas)
+
+# `ids` restricts the search to those candidates (e.g. a skill-index posting list)
+def search_candidates(query_embedding: list, n_results=5, where=None, include=None, ids=None):
+    return get_store(CANDIDATE_COLLECTION).query(query_embedding, n_results=n_results, where=where, include=include, ids=ids)
+
+# Page through stored candidates (ids and metadata only)
+def get_candidates_page(offset: int, limit: int):
+    return get_store(CANDIDATE_COLLECTION).get(offset=offset, limit=limit, include=["metadatas"])
+
+# Stored embeddings and metadata of the given candidates (order follows the result's ids)
+def get_candidates_by_ids(candidate_ids: list):
+    return get_store(CANDIDATE_COLLECTION).get(ids=candidate_ids, include=["embeddings", "metadatas"])
+
+def update_candidate_metadatas(candidate_ids: list, metadatas: list):
+    if not candidate_ids:
+        return
+    get_store(CANDIDATE_COLLECTION).update(ids=candidate_ids, metadatas=metadatas)
 
 def get_candidate_count():
-    return candidate_collection.count()
+    return get_store(CANDIDATE_COLLECTION).count()
 
 def peek_candidates(n=5):
-    result = candidate_collection.peek(limit=n)
-    # Remove embeddings to make it JSON serializable
-    if 'embeddings' in result:
-        del result['embeddings']
-    return result
-
+    return _without_embeddings(get_store(CANDIDATE_COLLECTION).peek(limit=n))
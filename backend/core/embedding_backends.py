@@ -0,0 +1,107 @@
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class EmbeddingBackend(ABC):
+    """
+    Interface every embedding backend implements.
+
+    `encode` takes a list of texts and returns a float32 array of shape
+    (len(texts), dimension). `name` namespaces cached vectors so that switching
+    backends never serves another backend's embeddings.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def encode(self, texts: list, batch_size: int = 32) -> np.ndarray:
+        ...
+
+
+class TorchBackend(EmbeddingBackend):
+    """PyTorch SentenceTransformer inference (the original implementation)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = backend_name("torch", model_name)
+        self._model = SentenceTransformer(model_name)
+
+    def encode(self, texts: list, batch_size: int = 32) -> np.ndarray:
+        return np.asarray(self._model.encode(texts, batch_size=batch_size), dtype=np.float32)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime inference of the same sentence-transformers model, without torch.
+
+    Reproduces the SentenceTransformer pipeline of all-MiniLM-L6-v2
+    (transformer -> mean pooling -> L2 normalize). With `quantize=True` the
+    exported graph is dynamically quantized to int8 once and reused.
+    """
+
+    def __init__(self, model_name: str, quantize: bool = False, max_seq_length: int = 256, threads: int = 0):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        model_path = hf_hub_download(repo_id, "onnx/model.onnx")
+        if quantize:
+            model_path = self._quantized(model_path)
+
+        self.name = backend_name("onnx", model_name, quantize)
+        self._tokenizer = Tokenizer.from_file(hf_hub_download(repo_id, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=max_seq_length)
+        self._tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+    @staticmethod
+    def _quantized(model_path: str) -> str:
+        quantized_path = os.path.join(os.path.dirname(model_path), "model_int8.onnx")
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        return quantized_path
+
+    def _encode_batch(self, texts: list) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        token_embeddings = self._session.run(None, feeds)[0]
+
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def encode(self, texts: list, batch_size: int = 32) -> np.ndarray:
+        batches = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        return np.concatenate(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+
+
+# Cache namespace of a backend, known without loading it
+def backend_name(kind: str, model_name: str, quantize: bool = False) -> str:
+    if kind.lower() == "torch":
+        return model_name
+    return f"{model_name}:{kind.lower()}{'-int8' if quantize else ''}"
+
+# Build the backend selected by config: "torch" or "onnx"
+def create_backend(kind: str, model_name: str, quantize: bool = False, threads: int = 0) -> EmbeddingBackend:
+    kind = kind.lower()
+    if kind == "torch":
+        return TorchBackend(model_name)
+    if kind == "onnx":
+        return OnnxBackend(model_name, quantize=quantize, threads=threads)
+    raise ValueError(f"Unknown embedding backend '{kind}' (expected 'torch' or 'onnx')")
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchScheduler:
+    """
+    Coalesces concurrent single-text embedding requests into batched encodes.
+
+    Requests are collected until `max_batch_size` texts are waiting or
+    `max_wait_ms` has passed since the first one arrived, then encoded with one
+    call to `encode_fn` on `executor` and fanned back out to their futures.
+    At most `max_concurrent_batches` encodes run at once; while they do, new
+    requests keep queueing and form the next, larger batch. If a batch fails,
+    its requests are re-encoded one at a time so only the bad one errors.
+    """
+
+    def __init__(self, encode_fn, executor, max_batch_size: int = 32, max_wait_ms: float = 5.0, max_concurrent_batches: int = 1):
+        self.encode_fn = encode_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+        self.queue_depth = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.batch_size = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._worker = None
+        # Encode tasks in flight; the loop only keeps weak references to tasks
+        self._tasks = set()
+        # Batches that failed and were re-encoded one request at a time
+        self.split_batches = 0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, text: str) -> list:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self.queue_depth.observe(self._queue.qsize())
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = self._loop.create_task(self._encode(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._encode_done)
+
+    def _encode_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Embedding batch failed: {task.exception()!r}")
+
+    async def _encode(self, batch: list):
+        try:
+            live = [(text, future) for text, future in batch if not future.done()]
+            if not live:
+                return
+            self.batch_size.observe(len(live))
+            try:
+                vectors = await self._loop.run_in_executor(self.executor, self.encode_fn, [text for text, _ in live])
+            except Exception as e:
+                if len(live) == 1:
+                    if not live[0][1].done():
+                        live[0][1].set_exception(e)
+                    return
+                # One bad input must not fail the requests it was coalesced with: encode each on its own
+                self.split_batches += 1
+                await self._encode_separately(live)
+                return
+            for (_, future), vector in zip(live, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        finally:
+            self._slots.release()
+
+    async def _encode_separately(self, live: list):
+        for text, future in live:
+            if future.done():
+                continue
+            try:
+                vectors = await self._loop.run_in_executor(self.executor, self.encode_fn, [text])
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(vectors[0])
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "encoding_batches": len(self._tasks),
+            "split_batches": self.split_batches,
+            "queue_depth": self.queue_depth.snapshot(),
+            "batch_size": self.batch_size.snapshot()
+        }
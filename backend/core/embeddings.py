@@ -1,6 +1,109 @@
-from sentence_transformers import SentenceTransformer
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core.embedding_backends import create_backend, backend_name
+from core.embedding_cache import EmbeddingCache, embedding_key
+from core.embedding_scheduler import MicroBatchScheduler
 
-_model = SentenceTransformer("all-MiniLM-L6-v2")
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+# Inference backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime, optionally int8-quantized)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_QUANTIZE = os.getenv("EMBEDDING_ONNX_QUANTIZE", "false").lower() == "true"
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+# Default number of texts per forward pass for batched encoding
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# In-memory LRU size and on-disk location of the embedding cache (empty path disables the disk tier)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite3")
+# Threads dedicated to running encodes off the event loop
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "2"))
+# Coalesce concurrent single-text requests into batches of up to N texts or T milliseconds
+EMBEDDING_MICRO_BATCHING = os.getenv("EMBEDDING_MICRO_BATCHING", "true").lower() == "true"
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+
+# The backend is loaded on first use (or by the startup warm-up), never at import time
+_backend = None
+_backend_lock = threading.Lock()
+_backend_load_seconds = None
+_namespace = backend_name(EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_QUANTIZE)
+_cache = EmbeddingCache(max_entries=EMBEDDING_CACHE_SIZE, db_path=EMBEDDING_CACHE_PATH or None)
+_executor = ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS, thread_name_prefix="embedding")
+
+def get_backend():
+    global _backend, _backend_load_seconds
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                start = time.perf_counter()
+                _backend = create_backend(EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, quantize=EMBEDDING_ONNX_QUANTIZE, threads=EMBEDDING_ONNX_THREADS)
+                _backend_load_seconds = round(time.perf_counter() - start, 3)
+    return _backend
+
+def is_embedding_model_loaded() -> bool:
+    return _backend is not None
+
+# Load the backend and run one encode on the embedding pool
+async def warm_up_embeddings():
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_executor, lambda: get_backend().encode(["warm up"]))
 
 def generate_embedding(text: str) -> list:
-    return _model.encode(text).tolist()
+    return generate_embeddings([text])[0]
+
+# Embed many texts with batched forward passes, only encoding cache misses
+def generate_embeddings(texts: list, batch_size: int = EMBEDDING_BATCH_SIZE) -> list:
+    if not texts:
+        return []
+    keys = [embedding_key(_namespace, text) for text in texts]
+    vectors = {}
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key in vectors or key in missing:
+            continue
+        cached = _cache.get(key)
+        if cached is None:
+            missing[key] = text
+        else:
+            vectors[key] = cached
+    if missing:
+        encoded = get_backend().encode(list(missing.values()), batch_size=batch_size)
+        fresh = dict(zip(missing.keys(), encoded))
+        _cache.put_many(fresh)
+        vectors.update(fresh)
+    return [vectors[key].tolist() for key in keys]
+
+# Async facade: run encodes on the embedding pool so handlers never block the event loop
+async def agenerate_embedding(text: str) -> list:
+    if EMBEDDING_MICRO_BATCHING:
+        return await _scheduler.submit(text)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, generate_embedding, text)
+
+async def agenerate_embeddings(texts: list, batch_size: int = EMBEDDING_BATCH_SIZE) -> list:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, generate_embeddings, texts, batch_size)
+
+_scheduler = MicroBatchScheduler(
+    generate_embeddings,
+    _executor,
+    max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+    max_wait_ms=EMBEDDING_MAX_WAIT_MS,
+    max_concurrent_batches=EMBEDDING_WORKERS
+)
+
+def get_embedding_cache_stats() -> dict:
+    return {"model": EMBEDDING_MODEL_NAME, "backend": _namespace, **_cache.stats()}
+
+def get_embedding_model_status() -> dict:
+    return {
+        "model": EMBEDDING_MODEL_NAME,
+        "backend": _namespace,
+        "loaded": is_embedding_model_loaded(),
+        "load_seconds": _backend_load_seconds
+    }
+
+def get_embedding_scheduler_stats() -> dict:
+    return {"enabled": EMBEDDING_MICRO_BATCHING, **_scheduler.stats()}
@@ -1,10 +1,13 @@
 import os
+import asyncio
+import hashlib
+import threading
+from contextlib import contextmanager
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_anthropic import ChatAnthropic
-from langchain_community.llms import HuggingFacePipeline
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
 from dotenv import load_dotenv
+from core.model_pool import LocalModelPool
 
 load_dotenv()
 
@@ -37,7 +40,8 @@ providers = {
         "google_api_key": os.getenv('gemini_api_key')
     },
     "local": {
-        "class": HuggingFacePipeline,
+        # HuggingFacePipeline, imported with transformers/torch only when a local model is loaded
+        "class": None,
         "models": [
             {"name": "microsoft/Phi-3-mini-4k-instruct", "display": "Phi-3 Mini (3.8B)"},
             {"name": "mistralai/Mistral-7B-Instruct-v0.1", "display": "Mistral 7B Instruct"},
@@ -50,8 +54,36 @@ providers = {
 current_provider = "gemini"
 current_model = "gemini-2.5-pro"
 
-# Cache for loaded local models
-loaded_models = {}
+# Memory budget and size limit of the pool of loaded local models
+LOCAL_MODEL_MEMORY_BUDGET_GB = float(os.getenv("LOCAL_MODEL_MEMORY_BUDGET_GB", "16"))
+LOCAL_MODEL_POOL_MAX_MODELS = int(os.getenv("LOCAL_MODEL_POOL_MAX_MODELS", "2"))
+
+# Per-provider HTTP connection pool limits for API clients, e.g. LLM_POOL_MAX_CONNECTIONS_OPENAI=50.
+# Only providers whose LangChain class accepts httpx clients are listed: ChatAnthropic and
+# ChatGoogleGenerativeAI build their own transports and expose no pool size option.
+LLM_POOL_LIMITS = {
+    provider: {
+        "max_connections": int(os.getenv(f"LLM_POOL_MAX_CONNECTIONS_{provider.upper()}", "20")),
+        "max_keepalive_connections": int(os.getenv(f"LLM_POOL_MAX_KEEPALIVE_{provider.upper()}", "10"))
+    }
+    for provider, p in providers.items()
+    if p["class"] is not None and "http_client" in getattr(p["class"], "model_fields", {})
+}
+
+# A dropped client's HTTP pools are closed once its leased calls finish and at least this long has passed
+# (callers that do not lease the client, e.g. the LangGraph workflow, get the grace period)
+LLM_CLIENT_CLOSE_GRACE_SECONDS = float(os.getenv("LLM_CLIENT_CLOSE_GRACE_SECONDS", "60"))
+
+# API clients reused across calls, keyed by (provider, model, api-key fingerprint)
+_clients = {}
+# httpx clients created for a cached API client, closed when it is invalidated
+_http_clients = {}
+# In-flight calls per client, by id(client); see lease()
+_leases = {}
+# Close tasks of dropped clients, referenced so they are not garbage-collected mid-close
+_closing = set()
+_clients_lock = threading.Lock()
+_client_stats = {"hits": 0, "misses": 0, "invalidations": 0}
 
 def set_model(provider: str, model: str, api_key: str = None):
     global current_provider, current_model
@@ -65,40 +97,159 @@ def set_model(provider: str, model: str, api_key: str = None):
                 providers[provider]["api_key"] = api_key
             elif provider == "gemini":
                 providers[provider]["google_api_key"] = api_key
+            # Clients built with the previous key must not be reused
+            invalidate_clients(provider)
+
+# Credential kwargs for an API provider, as its LangChain class expects them
+def _credentials(provider: str) -> dict:
+    p = providers[provider]
+    if "api_key" in p and p["api_key"]:
+        key_name = "api_key" if provider != "gemini" else "google_api_key"
+        return {key_name: p[key_name]}
+    elif "google_api_key" in p:
+        return {"google_api_key": p["google_api_key"]}
+    return {}
+
+def _fingerprint(credentials: dict) -> str:
+    secret = next(iter(credentials.values()), None) or ""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:12] if secret else "none"
+
+# Build an API client; returns it with the httpx clients created for it (empty when none)
+def _build_client(provider: str, model: str, credentials: dict) -> tuple:
+    cls = providers[provider]["class"]
+    kwargs = {"model": model, **credentials}
+    # Retries are handled by core.llm_scheduler, which honours Retry-After
+    if "max_retries" in getattr(cls, "model_fields", {}):
+        kwargs["max_retries"] = 0
+    # Bound and share the connection pool where the client accepts httpx clients
+    http_clients = ()
+    if provider in LLM_POOL_LIMITS:
+        import httpx
+
+        limits = httpx.Limits(**LLM_POOL_LIMITS[provider])
+        kwargs["http_client"] = httpx.Client(limits=limits)
+        kwargs["http_async_client"] = httpx.AsyncClient(limits=limits)
+        http_clients = (kwargs["http_client"], kwargs["http_async_client"])
+    return cls(**kwargs), http_clients
+
+# Mark a call in flight on `client`, so invalidate_clients does not close its HTTP pools under it
+@contextmanager
+def lease(client):
+    with _clients_lock:
+        _leases[id(client)] = _leases.get(id(client), 0) + 1
+    try:
+        yield client
+    finally:
+        with _clients_lock:
+            _leases[id(client)] -= 1
+            if not _leases[id(client)]:
+                del _leases[id(client)]
+
+async def _aclose_http_clients(http_clients: tuple):
+    for http_client in http_clients:
+        if hasattr(http_client, "aclose"):
+            await http_client.aclose()
+        else:
+            http_client.close()
 
-def get_llm():
-    p = providers[current_provider]
-    cls = p["class"]
-    
-    if current_provider == "local":
+# Close a dropped client's connection pools once the grace period is over and no leased call uses it
+async def _close_when_idle(client, http_clients: tuple):
+    await asyncio.sleep(LLM_CLIENT_CLOSE_GRACE_SECONDS)
+    while _leases.get(id(client)):
+        await asyncio.sleep(1)
+    await _aclose_http_clients(http_clients)
+
+def _retire(client, http_clients: tuple):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No event loop, so no async call can be using the client
+        asyncio.run(_aclose_http_clients(http_clients))
+        return
+    task = loop.create_task(_close_when_idle(client, http_clients))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+# Drop cached clients of one provider (or all), e.g. after its API key changes.
+# Their HTTP pools are closed in the background once calls still using them finish.
+def invalidate_clients(provider: str = None):
+    with _clients_lock:
+        dropped = []
+        for key in [k for k in _clients if provider is None or k[0] == provider]:
+            dropped.append((_clients.pop(key), _http_clients.pop(key, ())))
+            _client_stats["invalidations"] += 1
+    for client, http_clients in dropped:
+        if http_clients:
+            _retire(client, http_clients)
+
+def get_llm_client_stats() -> dict:
+    with _clients_lock:
+        return {
+            **_client_stats,
+            "pool_limits": LLM_POOL_LIMITS,
+            "closing": len(_closing),
+            "clients": [{"provider": k[0], "model": k[1], "key_fingerprint": k[2]} for k in _clients]
+        }
+
+# Load a local HuggingFace model; heavy imports are deferred to here
+def _load_local_model(model_name: str):
+    from langchain_community.llms import HuggingFacePipeline
+    from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(model_name)
+    pipe = pipeline(
+        "text-generation",
+        model=model,
+        tokenizer=tokenizer,
+        max_new_tokens=512,
+        temperature=0.7,
+        do_sample=True,
+        pad_token_id=tokenizer.eos_token_id
+    )
+    return HuggingFacePipeline(pipeline=pipe)
+
+# Loaded local models, evicted least recently used first when over budget
+loaded_models = LocalModelPool(
+    _load_local_model,
+    memory_budget_bytes=int(LOCAL_MODEL_MEMORY_BUDGET_GB * 1024 ** 3),
+    max_models=LOCAL_MODEL_POOL_MAX_MODELS
+)
+
+def get_llm(provider: str = None, model: str = None):
+    provider = provider or current_provider
+    model = model or current_model
+
+    if provider == "local":
         # Handle local models
-        if current_model not in loaded_models:
-            try:
-                print(f"Downloading local model: {current_model}")
-                tokenizer = AutoTokenizer.from_pretrained(current_model)
-                model = AutoModelForCausalLM.from_pretrained(current_model)
-                pipe = pipeline(
-                    "text-generation",
-                    model=model,
-                    tokenizer=tokenizer,
-                    max_new_tokens=512,
-                    temperature=0.7,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id
-                )
-                loaded_models[current_model] = HuggingFacePipeline(pipeline=pipe)
-                print(f"Model {current_model} loaded and ready for offline use.")
-            except Exception as e:
-                raise Exception(f"Failed to load local model {current_model}: {str(e)}")
-        return loaded_models[current_model]
+        if model not in loaded_models:
+            print(f"Downloading local model: {model}")
+        try:
+            return loaded_models.get(model)
+        except Exception as e:
+            raise Exception(f"Failed to load local model {model}: {str(e)}")
     else:
-        # Handle API-based models
-        kwargs = {"model": current_model}
-        if "api_key" in p and p["api_key"]:
-            kwargs["api_key" if current_provider != "gemini" else "google_api_key"] = p["api_key" if current_provider != "gemini" else "google_api_key"]
-        elif "google_api_key" in p:
-            kwargs["google_api_key"] = p["google_api_key"]
-        return cls(**kwargs)
+        # Handle API-based models, reusing the client and its HTTP pool
+        credentials = _credentials(provider)
+        key = (provider, model, _fingerprint(credentials))
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is not None:
+                _client_stats["hits"] += 1
+                return client
+            _client_stats["misses"] += 1
+            client, _http_clients[key] = _build_client(provider, model, credentials)
+            _clients[key] = client
+            return client
+
+def get_loaded_local_models():
+    return loaded_models.names()
+
+def get_local_model_pool_stats():
+    return loaded_models.stats()
+
+def unload_local_model(model: str) -> bool:
+    return loaded_models.unload(model)
 
 def get_available_models():
     return {provider: data["models"] for provider, data in providers.items()}
@@ -0,0 +1,121 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+# Stable key for an LLM call: provider, model, messages and generation params
+def response_key(provider: str, model: str, messages: list, params: dict) -> str:
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "messages": [[getattr(m, "type", "raw"), getattr(m, "content", m)] for m in messages],
+        "params": params
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Exact-match cache of LLM responses with per-entry TTL.
+
+    The memory tier is a bounded LRU; the optional sqlite tier persists
+    responses across restarts. Hit/miss counters are kept per call site.
+    """
+
+    def __init__(self, max_entries: int = 5000, db_path: str = None):
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {}
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def _count(self, call_site: str, field: str):
+        stats = self._stats.setdefault(call_site, {"hits": 0, "misses": 0, "bypassed": 0, "rejected": 0})
+        stats[field] += 1
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str, call_site: str = "default"):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._memory[key]
+                entry = None
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, *entry)
+            if entry is None:
+                self._count(call_site, "misses")
+                return None
+            self._memory.move_to_end(key)
+            self._count(call_site, "hits")
+            return entry[0]
+
+    def put(self, key: str, value: str, ttl: float):
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+                self._conn.commit()
+
+    # Drop an entry the caller could not use (e.g. a reply that no longer parses)
+    def discard(self, key: str, call_site: str = "default"):
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+            self._count(call_site, "rejected")
+
+    def record_bypass(self, call_site: str):
+        with self._lock:
+            self._count(call_site, "bypassed")
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, expires_at) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = sum(s["hits"] for s in self._stats.values())
+            misses = sum(s["misses"] for s in self._stats.values())
+            call_sites = {
+                site: {**s, "hit_rate": round(s["hits"] / (s["hits"] + s["misses"]), 4) if s["hits"] + s["misses"] else 0.0}
+                for site, s in self._stats.items()
+            }
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "persistent": self._conn is not None,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "call_sites": call_sites
+            }
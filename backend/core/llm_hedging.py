@@ -0,0 +1,172 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Hedging sends a slow call to a secondary provider/model and keeps whichever answers first
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+# Secondary target as "provider:model", e.g. "openai:gpt-5-nano"
+LLM_HEDGE_SECONDARY = os.getenv("LLM_HEDGE_SECONDARY", "")
+# Hedge once the primary is slower than this percentile of its recent latencies for the call site
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# Deadline used until enough samples exist
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "10"))
+# Comma-separated call sites that hedge when LLM_HEDGE_ENABLED; override one with LLM_HEDGE_<CALL_SITE>=true|false
+LLM_HEDGE_CALL_SITES = {s.strip() for s in os.getenv("LLM_HEDGE_CALL_SITES", "parse_search_query,generate_match_score,generate_reason").split(",") if s.strip()}
+
+
+# Latency at percentile `pct` of (seconds, censored) samples, by Kaplan-Meier.
+# A censored sample is an attempt cancelled after `seconds`: its latency is known only to exceed that.
+# When cancellations leave the percentile unobserved, the longest sample is returned as a lower bound.
+def censored_percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    survival, at_risk = 1.0, len(ordered)
+    for seconds, censored in ordered:
+        if not censored:
+            survival *= 1 - 1 / at_risk
+            if 1 - survival >= pct / 100 - 1e-9:
+                return seconds
+        at_risk -= 1
+    return ordered[-1][0]
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies per (provider, model, call site).
+
+    Latency is measured from dispatch to the provider, not from when the
+    call was queued. Attempts cancelled by a hedge are kept as censored
+    samples so that slow primaries still push the deadline up.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, model: str, call_site: str, seconds: float, censored: bool = False):
+        with self._lock:
+            self._samples.setdefault((provider, model, call_site), deque(maxlen=self.window)).append((seconds, censored))
+
+    def percentile(self, provider: str, model: str, call_site: str, pct: float):
+        with self._lock:
+            samples = list(self._samples.get((provider, model, call_site), ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return censored_percentile(samples, pct)
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = {key: list(values) for key, values in self._samples.items()}
+        result = {}
+        for (provider, model, call_site), samples in snapshot.items():
+            pick = lambda pct: round(censored_percentile(samples, pct), 3)
+            result.setdefault(f"{provider}:{model}", {})[call_site] = {
+                "samples": len(samples), "censored": sum(1 for _, censored in samples if censored),
+                "p50": pick(50), "p95": pick(95), "p99": pick(99)
+            }
+        return result
+
+
+latency_tracker = LatencyTracker()
+_hedge_stats = {"hedged": 0, "secondary_wins": 0, "primary_wins": 0, "primary_failures_recovered": 0}
+
+def secondary_target():
+    if ":" not in LLM_HEDGE_SECONDARY:
+        return None
+    provider, model = LLM_HEDGE_SECONDARY.split(":", 1)
+    return provider, model
+
+# Whether a call site hedges: explicit per-call flag, then per-site env override, then the global list
+def should_hedge(call_site: str, hedge: bool = None) -> bool:
+    if hedge is not None:
+        return hedge and secondary_target() is not None
+    override = os.getenv(f"LLM_HEDGE_{call_site.upper()}")
+    if override is not None:
+        enabled = override.lower() == "true"
+    else:
+        enabled = LLM_HEDGE_ENABLED and call_site in LLM_HEDGE_CALL_SITES
+    return enabled and secondary_target() is not None
+
+def hedge_delay(provider: str, model: str, call_site: str) -> float:
+    deadline = latency_tracker.percentile(provider, model, call_site, LLM_HEDGE_PERCENTILE)
+    return deadline if deadline is not None else LLM_HEDGE_DEFAULT_DELAY_SECONDS
+
+# Run `call` through `run` (e.g. a scheduler) and record its latency from dispatch, not from queueing.
+# A success is recorded as is; an attempt cancelled after dispatch is recorded as censored.
+# Failed attempts are not recorded, nor is the backoff before the scheduler retries them.
+async def timed(run, call, provider: str, model: str, call_site: str):
+    start = None
+
+    async def dispatched():
+        nonlocal start
+        start = time.perf_counter()
+        try:
+            return await call()
+        except Exception:
+            start = None
+            raise
+
+    try:
+        result = await run(dispatched)
+    except asyncio.CancelledError:
+        if start is not None:
+            latency_tracker.record(provider, model, call_site, time.perf_counter() - start, censored=True)
+        raise
+    latency_tracker.record(provider, model, call_site, time.perf_counter() - start)
+    return result
+
+async def _cancel(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+# Start the primary; if it is slower than its deadline (or fails), race it against the secondary
+async def hedged_call(primary, secondary, delay: float):
+    primary_task = asyncio.ensure_future(primary())
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+    except asyncio.CancelledError:
+        await _cancel([primary_task])
+        raise
+    if primary_task in done and primary_task.exception() is None:
+        return primary_task.result()
+
+    _hedge_stats["hedged"] += 1
+    primary_failed = primary_task in done
+    pending = {asyncio.ensure_future(secondary())}
+    if not primary_failed:
+        pending.add(primary_task)
+    last_error = primary_task.exception() if primary_failed else None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    continue
+                if task is primary_task:
+                    _hedge_stats["primary_wins"] += 1
+                else:
+                    _hedge_stats["secondary_wins"] += 1
+                    if primary_failed:
+                        _hedge_stats["primary_failures_recovered"] += 1
+                return task.result()
+        raise last_error
+    finally:
+        await _cancel(list(pending))
+
+def get_hedging_stats() -> dict:
+    return {
+        "enabled": LLM_HEDGE_ENABLED,
+        "secondary": LLM_HEDGE_SECONDARY or None,
+        "percentile": LLM_HEDGE_PERCENTILE,
+        "call_sites": sorted(LLM_HEDGE_CALL_SITES),
+        **_hedge_stats,
+        "latency_seconds": latency_tracker.stats()
+    }
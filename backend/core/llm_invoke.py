@@ -0,0 +1,135 @@
+import os
+import json
+from dotenv import load_dotenv
+from core import llm
+from core.llm_cache import ResponseCache, response_key
+from core.llm_scheduler import get_scheduler, estimate_tokens
+from core.llm_hedging import should_hedge, secondary_target, hedge_delay, hedged_call, timed
+
+load_dotenv()
+
+# Exact-match response cache: LRU size, optional sqlite tier (empty path disables it)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "5000"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+LLM_CACHE_DEFAULT_TTL = float(os.getenv("LLM_CACHE_DEFAULT_TTL", "0"))
+
+# Seconds a response stays valid per call site; override with LLM_CACHE_TTL_<CALL_SITE>.
+# Call sites not listed (e.g. emails) use LLM_CACHE_DEFAULT_TTL, which disables caching at 0.
+CALL_SITE_TTLS = {
+    "parse_search_query": 3600,
+    "generate_structured_jd": 3600,
+    "generate_match_score": 86400,
+    "generate_match_scores_batch": 86400,
+    "generate_reason": 86400
+}
+
+# Client attributes that change the output for identical messages
+GENERATION_PARAMS = ("temperature", "max_tokens", "max_output_tokens", "top_p", "top_k")
+
+_cache = ResponseCache(max_entries=LLM_CACHE_SIZE, db_path=LLM_CACHE_PATH or None)
+# Tokens sent to and received from providers per call site (cache hits spend none)
+_token_usage = {}
+
+def cache_ttl(call_site: str) -> float:
+    override = os.getenv(f"LLM_CACHE_TTL_{call_site.upper()}")
+    if override is not None:
+        return float(override)
+    return CALL_SITE_TTLS.get(call_site, LLM_CACHE_DEFAULT_TTL)
+
+def _generation_params(client) -> dict:
+    return {name: getattr(client, name) for name in GENERATION_PARAMS if getattr(client, name, None) is not None}
+
+# Chat models return a message, local pipelines return a plain string
+def _response_text(response) -> str:
+    content = getattr(response, "content", response)
+    return content if isinstance(content, str) else str(content)
+
+# Count provider-reported usage when available, otherwise the ~4 characters per token estimate
+def _record_usage(call_site: str, messages: list, response, text: str):
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens") if isinstance(usage, dict) else None
+    output_tokens = usage.get("output_tokens") if isinstance(usage, dict) else None
+    entry = _token_usage.setdefault(call_site, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "estimated_calls": 0})
+    if input_tokens is None or output_tokens is None:
+        input_tokens, output_tokens = estimate_tokens(messages), estimate_tokens([text])
+        entry["estimated_calls"] += 1
+    entry["calls"] += 1
+    entry["input_tokens"] += input_tokens
+    entry["output_tokens"] += output_tokens
+
+# Call one provider through its scheduler (concurrency, rate limits, retries), tracking latency and tokens.
+# Returns the text with the client that produced it.
+async def _scheduled_invoke(provider: str, model: str, client, messages: list, call_site: str) -> tuple:
+    run = lambda call: get_scheduler(provider).run(call, estimate_tokens(messages))
+    with llm.lease(client):
+        response = await timed(run, lambda: client.ainvoke(messages), provider, model, call_site)
+    text = _response_text(response)
+    _record_usage(call_site, messages, response, text)
+    return text, (provider, model, client)
+
+# Call the primary, hedging to the secondary provider/model when enabled for this call site.
+# Returns the text and the (provider, model, client) that answered.
+async def _invoke(provider: str, model: str, client, messages: list, call_site: str, hedge: bool) -> tuple:
+    primary = lambda: _scheduled_invoke(provider, model, client, messages, call_site)
+    target = secondary_target()
+    if not should_hedge(call_site, hedge) or target == (provider, model):
+        return await primary()
+    secondary_provider, secondary_model = target
+    # The secondary client is only built once the hedge actually fires
+    secondary = lambda: _scheduled_invoke(secondary_provider, secondary_model,
+                                          llm.get_llm(secondary_provider, secondary_model), messages, call_site)
+    return await hedged_call(primary, secondary, hedge_delay(provider, model, call_site))
+
+# Invoke the current LLM and return the response text, serving repeats from the cache.
+# `hedge` forces hedging on or off for this call; None follows the call-site config.
+# `validate(text)` says whether the caller can use a reply: only valid replies are cached, and a
+# cached reply that fails it is dropped and fetched again.
+async def invoke_llm(messages: list, call_site: str = "default", bypass_cache: bool = False, hedge: bool = None,
+                     validate=None) -> str:
+    provider, model = llm.current_provider, llm.current_model
+    client = llm.get_llm(provider, model)
+    ttl = cache_ttl(call_site)
+    if bypass_cache:
+        _cache.record_bypass(call_site)
+    if bypass_cache or not LLM_CACHE_ENABLED or ttl <= 0:
+        text, _ = await _invoke(provider, model, client, messages, call_site, hedge)
+        return text
+
+    key = response_key(provider, model, messages, _generation_params(client))
+    cached = _cache.get(key, call_site)
+    if cached is not None:
+        if validate is None or validate(cached):
+            return cached
+        _cache.discard(key, call_site)
+    text, (answered_provider, answered_model, answered_client) = await _invoke(provider, model, client, messages,
+                                                                               call_site, hedge)
+    if validate is None or validate(text):
+        # A hedged call the secondary won is cached under the secondary's key, never the primary's
+        if answered_client is not client:
+            key = response_key(answered_provider, answered_model, messages, _generation_params(answered_client))
+        _cache.put(key, text, ttl)
+    return text
+
+# Strip the ```json fences models often wrap JSON replies in
+def strip_json_fence(text: str) -> str:
+    result = text.strip()
+    if result.startswith('```json'):
+        result = result[7:]
+    if result.endswith('```'):
+        result = result[:-3]
+    return result.strip()
+
+# `validate` for call sites that expect a JSON reply
+def is_json_reply(text: str) -> bool:
+    try:
+        json.loads(strip_json_fence(text))
+        return True
+    except ValueError:
+        return False
+
+def get_llm_cache_stats() -> dict:
+    return {"enabled": LLM_CACHE_ENABLED, **_cache.stats()}
+
+def get_llm_token_stats() -> dict:
+    return {call_site: dict(entry) for call_site, entry in _token_usage.items()}
@@ -0,0 +1,216 @@
+import os
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from dotenv import load_dotenv
+from core.metrics import Histogram
+
+load_dotenv()
+
+# Retry policy shared by all providers
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+
+# Status codes worth retrying: throttling, timeouts and transient server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERROR_NAMES = ("RateLimit", "ResourceExhausted", "Timeout", "ServiceUnavailable", "Overloaded", "APIConnection")
+
+
+class TokenBucket:
+    """Refills `rate_per_min` units per minute up to one minute's worth; a rate of 0 means unlimited."""
+
+    def __init__(self, rate_per_min: float):
+        self.rate_per_min = rate_per_min
+        self.capacity = rate_per_min
+        self._level = rate_per_min
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate_per_min / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if not self.rate_per_min:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self._level) * 60 / self.rate_per_min)
+
+    def consume(self, amount: float):
+        if not self.rate_per_min:
+            return
+        self._refill()
+        # The level may go negative when actual usage exceeds the estimate; later callers wait it off
+        self._level -= amount
+
+
+# Rough token estimate (~4 characters per token) used before the provider reports usage
+def estimate_tokens(messages: list) -> int:
+    return sum(len(str(getattr(m, "content", m))) for m in messages) // 4 + 1
+
+def _status_code(exc: Exception):
+    for candidate in (exc, getattr(exc, "response", None)):
+        code = getattr(candidate, "status_code", None) or getattr(candidate, "code", None)
+        try:
+            return int(code)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def is_throttled(exc: Exception) -> bool:
+    return _status_code(exc) == 429 or any(name in type(exc).__name__ for name in ("RateLimit", "ResourceExhausted"))
+
+def is_retryable(exc: Exception) -> bool:
+    if _status_code(exc) in RETRYABLE_STATUS_CODES:
+        return True
+    return any(name in type(exc).__name__ for name in RETRYABLE_ERROR_NAMES)
+
+# Seconds requested by a Retry-After header (delta-seconds or HTTP date), if any
+def retry_after_seconds(exc: Exception):
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+# Full-jitter exponential backoff, never shorter than the server's Retry-After
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, LLM_BACKOFF_MAX_SECONDS))
+    return delay
+
+
+class ProviderScheduler:
+    """
+    Admission control for one LLM provider.
+
+    Bounds in-flight calls with a FIFO semaphore, paces admissions through
+    request and token buckets behind a FIFO lock so callers are served in
+    arrival order, and retries throttled or transient failures with jittered
+    exponential backoff that honours Retry-After.
+    """
+
+    def __init__(self, provider: str, max_concurrency: int, requests_per_min: float = 0, tokens_per_min: float = 0):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._admission = asyncio.Lock()
+        self._requests = TokenBucket(requests_per_min)
+        self._tokens = TokenBucket(tokens_per_min)
+        self.queue_wait = Histogram([0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60])
+        self.queued = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+    async def _admit(self, tokens: int):
+        async with self._admission:
+            while True:
+                wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self._requests.consume(1)
+            self._tokens.consume(tokens)
+
+    async def _attempt(self, call, tokens: int):
+        start = time.perf_counter()
+        self.queued += 1
+        admitted = False
+        try:
+            async with self._semaphore:
+                await self._admit(tokens)
+                admitted = True
+                self.queued -= 1
+                self.queue_wait.observe(time.perf_counter() - start)
+                self.in_flight += 1
+                try:
+                    response = await call()
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if not admitted:
+                self.queued -= 1
+        # Settle the token bucket with reported usage when the provider returns it
+        usage = getattr(response, "usage_metadata", None) or {}
+        actual = usage.get("total_tokens") if isinstance(usage, dict) else None
+        if actual:
+            self._tokens.consume(actual - tokens)
+        return response
+
+    async def run(self, call, estimated_tokens: int = 0):
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(call, estimated_tokens)
+            except Exception as e:
+                if is_throttled(e):
+                    self.throttled += 1
+                if attempt >= LLM_MAX_RETRIES or not is_retryable(e):
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, retry_after_seconds(e)))
+                attempt += 1
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests_per_min": self._requests.rate_per_min,
+            "tokens_per_min": self._tokens.rate_per_min,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "queue_wait_seconds": self.queue_wait.snapshot()
+        }
+
+
+# Per-provider limits, e.g. LLM_MAX_CONCURRENCY_GEMINI=4, LLM_REQUESTS_PER_MIN_OPENAI=500 (0 = unlimited)
+def _provider_limits(provider: str) -> dict:
+    default_concurrency = "1" if provider == "local" else "8"
+    return {
+        "max_concurrency": int(os.getenv(f"LLM_MAX_CONCURRENCY_{provider.upper()}", default_concurrency)),
+        "requests_per_min": float(os.getenv(f"LLM_REQUESTS_PER_MIN_{provider.upper()}", "0")),
+        "tokens_per_min": float(os.getenv(f"LLM_TOKENS_PER_MIN_{provider.upper()}", "0"))
+    }
+
+_schedulers = {}
+
+def get_scheduler(provider: str) -> ProviderScheduler:
+    scheduler = _schedulers.get(provider)
+    if scheduler is None:
+        scheduler = ProviderScheduler(provider, **_provider_limits(provider))
+        _schedulers[provider] = scheduler
+    return scheduler
+
+def get_scheduler_stats() -> dict:
+    return {
+        "max_retries": LLM_MAX_RETRIES,
+        "backoff_base_seconds": LLM_BACKOFF_BASE_SECONDS,
+        "backoff_max_seconds": LLM_BACKOFF_MAX_SECONDS,
+        "providers": {provider: scheduler.stats() for provider, scheduler in _schedulers.items()}
+    }
@@ -0,0 +1,36 @@
+import threading
+
+
+class Histogram:
+    """
+    Minimal cumulative-bucket histogram in the Prometheus style.
+
+    Each bucket counts observations less than or equal to its upper bound;
+    the implicit "+Inf" bucket equals the total count.
+    """
+
+    def __init__(self, buckets: list):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * len(self.buckets)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {str(bound): count for bound, count in zip(self.buckets, self._counts)}
+            buckets["+Inf"] = self._count
+            return {
+                "buckets": buckets,
+                "count": self._count,
+                "sum": round(self._sum, 4),
+                "mean": round(self._sum / self._count, 4) if self._count else 0.0
+            }
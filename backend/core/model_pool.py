@@ -0,0 +1,153 @@
+import gc
+import sys
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+
+
+# Bytes held by a HuggingFacePipeline's weights and buffers
+def estimate_model_bytes(llm) -> int:
+    model = getattr(getattr(llm, "pipeline", None), "model", None)
+    if model is None:
+        return 0
+    if hasattr(model, "get_memory_footprint"):
+        return int(model.get_memory_footprint())
+    return sum(t.numel() * t.element_size() for t in list(model.parameters()) + list(model.buffers()))
+
+
+# Return freed model memory (Python objects and cached CUDA blocks) after an eviction
+def _release_memory():
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class LocalModelPool:
+    """
+    LRU pool of loaded local models bounded by a memory budget.
+
+    `get` returns a cached model or loads it with `loader`, evicting least
+    recently used models first so that the pool stays within `max_models` and
+    `memory_budget_bytes`. Sizes seen on earlier loads are remembered so that
+    room can be made before a known model is loaded again.
+
+    Loading happens outside the pool lock, so `stats` and hits on other
+    models never wait for a load; concurrent `get`s of a model that is being
+    loaded wait for that one load instead of starting their own.
+    """
+
+    def __init__(self, loader, memory_budget_bytes: int, max_models: int = 2):
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_models = max_models
+        self._models = OrderedDict()
+        self._known_sizes = {}
+        self._loading = {}
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    def names(self) -> list:
+        return list(self._models.keys())
+
+    def total_bytes(self) -> int:
+        return sum(entry["size_bytes"] for entry in self._models.values())
+
+    def get(self, name: str):
+        with self._lock:
+            if name in self._models:
+                return self._touch(name)
+            pending = self._loading.get(name)
+            if pending is None:
+                pending = self._loading[name] = Future()
+                evicted = self._make_room(self._known_sizes.get(name, 0), keep=None, slots=1)
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            pending.result()
+            with self._lock:
+                return self._touch(name) if name in self._models else pending.result()
+
+        if evicted:
+            _release_memory()
+        try:
+            start = time.perf_counter()
+            llm = self.loader(name)
+            size = estimate_model_bytes(llm)
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(name, None)
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            self._models[name] = {
+                "llm": llm,
+                "size_bytes": size,
+                "load_seconds": round(time.perf_counter() - start, 3),
+                "loaded_at": datetime.now(),
+                "last_used": None,
+                "uses": 0
+            }
+            self._known_sizes[name] = size
+            evicted = self._make_room(0, keep=name, slots=0)
+            self._loading.pop(name, None)
+            self._touch(name)
+        pending.set_result(llm)
+        if evicted:
+            _release_memory()
+        return llm
+
+    # Mark a cached model as just used; caller holds the lock
+    def _touch(self, name: str):
+        entry = self._models[name]
+        self._models.move_to_end(name)
+        entry["last_used"] = datetime.now()
+        entry["uses"] += 1
+        return entry["llm"]
+
+    # Evict until there is room; caller holds the lock and calls _release_memory after releasing it
+    def _make_room(self, incoming_bytes: int, keep, slots: int) -> int:
+        evicted = 0
+        while self._models:
+            over_count = len(self._models) + slots > self.max_models
+            over_budget = self.total_bytes() + incoming_bytes > self.memory_budget_bytes
+            if not (over_count or over_budget):
+                break
+            victim = next((n for n in self._models if n != keep), None)
+            if victim is None:
+                break
+            self._evict(victim)
+            evicted += 1
+        return evicted
+
+    def _evict(self, name: str):
+        self._models.pop(name, None)
+        self.evictions += 1
+
+    def unload(self, name: str) -> bool:
+        with self._lock:
+            if name not in self._models:
+                return False
+            self._evict(name)
+        _release_memory()
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "max_models": self.max_models,
+                "total_bytes": self.total_bytes(),
+                "evictions": self.evictions,
+                "loading": list(self._loading),
+                "models": [
+                    {"name": name, **{k: v for k, v in entry.items() if k != "llm"}}
+                    for name, entry in self._models.items()
+                ]
+            }
@@ -0,0 +1,90 @@
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Bounded cache that reuses a value stored for a semantically similar input.
+
+    Entries are looked up by cosine similarity of their embedding to the
+    query embedding; the best entry at or above `threshold` whose `guard`
+    equals the query's is a hit. The guard carries facts that embeddings blur
+    (such as the numbers in a query), so near-paraphrases with different
+    constraints never share an entry. Least recently used entries are evicted
+    beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 1000, threshold: float = 0.92):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._matrix = None
+        self._ids = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _rebuild(self):
+        self._ids = list(self._entries.keys())
+        self._matrix = np.stack([self._entries[i]["vector"] for i in self._ids]) if self._ids else None
+
+    def lookup(self, vector, guard=None):
+        with self._lock:
+            if self._matrix is None:
+                self.misses += 1
+                return None
+            similarities = self._matrix @ self._normalize(vector)
+            for index in np.argsort(-similarities):
+                if similarities[index] < self.threshold:
+                    break
+                entry_id = self._ids[index]
+                entry = self._entries[entry_id]
+                if entry["guard"] == guard:
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    self.seconds_saved += entry["cost_seconds"]
+                    return copy.deepcopy(entry["value"])
+            self.misses += 1
+            return None
+
+    def store(self, vector, value, guard=None, cost_seconds: float = 0.0):
+        with self._lock:
+            self._entries[self._next_id] = {
+                "vector": self._normalize(vector),
+                "value": copy.deepcopy(value),
+                "guard": guard,
+                "cost_seconds": cost_seconds
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._rebuild()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rebuild()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "seconds_saved": round(self.seconds_saved, 3)
+            }
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# L2-normalize each row (or a single vector); zero rows stay zero.
+# With copy=False a float32 input is normalized in place, which matters for large candidate matrices.
+def normalize_rows(matrix, copy: bool = True) -> np.ndarray:
+    matrix = np.array(matrix, dtype=np.float32, copy=copy) if copy else np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+def cosine_similarities(queries, candidates, normalized: bool = False) -> np.ndarray:
+    """
+    Cosine similarity of one or many query vectors against a candidate matrix.
+
+    Args:
+        queries: One vector of shape (dim,) or a matrix of shape (q, dim)
+        candidates: Candidate matrix of shape (n, dim)
+        normalized: Skip normalization when both inputs already have unit-length rows
+
+    Returns:
+        Similarities of shape (n,) for a single query, (q, n) otherwise
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    candidates = np.asarray(candidates, dtype=np.float32)
+    if candidates.size == 0:
+        # No candidates: an empty list has no dim to match against
+        return np.zeros(queries.shape[:-1] + (0,), dtype=np.float32)
+    if not normalized:
+        queries = normalize_rows(queries)
+        candidates = normalize_rows(candidates)
+    # One matmul for every (query, candidate) pair
+    return candidates @ queries if queries.ndim == 1 else queries @ candidates.T
+
+def top_k(scores, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, along the last axis.
+
+    argpartition finds the k best in linear time; only those k are sorted.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+# Best k candidates per query as (indices, similarities)
+def search(queries, candidates, k: int, normalized: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    scores = cosine_similarities(queries, candidates, normalized)
+    indices = top_k(scores, k)
+    return indices, np.take_along_axis(scores, indices, axis=-1)
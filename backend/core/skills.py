@@ -0,0 +1,255 @@
+import os
+import re
+import json
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Optional JSON file of extra {"alias": "Canonical Skill"} pairs, merged over the built-in table
+SKILL_ALIASES_PATH = os.getenv("SKILL_ALIASES_PATH", "")
+
+# Canonical skills recognised in free text even when nobody uses an alias for them
+KNOWN_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C++", "C#", "SQL", "React", "Angular",
+    "Vue.js", "Node.js", "Django", "Flask", "FastAPI", "Spring Boot", "Microservices", "Redux", "Pandas",
+    "NumPy", "Scikit-Learn", "TensorFlow", "PyTorch", "Machine Learning", "Deep Learning", "Data Science",
+    "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "PostgreSQL", "MongoDB", "UI/UX"
+]
+
+# Alias (lowercase) -> canonical skill name. Canonical names map to themselves implicitly.
+SKILL_ALIASES = {
+    "ml": "Machine Learning",
+    "machine-learning": "Machine Learning",
+    "dl": "Deep Learning",
+    "ai": "Artificial Intelligence",
+    "nlp": "Natural Language Processing",
+    "cv": "Computer Vision",
+    "ds": "Data Science",
+    "k8s": "Kubernetes",
+    "kube": "Kubernetes",
+    "js": "JavaScript",
+    "ts": "TypeScript",
+    "py": "Python",
+    "python3": "Python",
+    "golang": "Go",
+    "c sharp": "C#",
+    "csharp": "C#",
+    "cpp": "C++",
+    "reactjs": "React",
+    "react.js": "React",
+    "nodejs": "Node.js",
+    "node": "Node.js",
+    "vuejs": "Vue.js",
+    "vue": "Vue.js",
+    "nextjs": "Next.js",
+    "postgres": "PostgreSQL",
+    "postgresql": "PostgreSQL",
+    "mongo": "MongoDB",
+    "sklearn": "Scikit-Learn",
+    "scikit learn": "Scikit-Learn",
+    "tf": "TensorFlow",
+    "amazon web services": "AWS",
+    "gcp": "Google Cloud",
+    "google cloud platform": "Google Cloud",
+    "azure cloud": "Azure",
+    "springboot": "Spring Boot",
+    "ui/ux": "UI/UX",
+    "ux/ui": "UI/UX",
+    "ci/cd": "CI/CD",
+    "cicd": "CI/CD",
+}
+
+# Single-word aliases that are also everyday words or abbreviations ("ready to go", "send your CV").
+# Skill lists always resolve them; free text only does when they are quoted ("'go'"), sit in a list
+# of other skills ("Python, CV and NLP"), are followed by a role word ("Go developers"), or, except
+# for CAPITALIZED_ABBREVIATIONS, are written in capitals ("AI") or capitalized mid-sentence ("with Go").
+AMBIGUOUS_ALIASES = {"go", "ai", "cv", "ds", "ts", "tf", "node", "py", "dl", "kube", "vue"}
+# Ambiguous aliases that are written in capitals in ordinary text too ("CV" as in résumé)
+CAPITALIZED_ABBREVIATIONS = {"cv", "ds", "ts"}
+# Words after a skill that mark it as one ("Go developer", "CV engineer")
+SKILL_ROLE_WORDS = {"developer", "developers", "engineer", "engineers", "programmer", "programmers", "dev", "devs",
+                    "experience", "skills", "stack", "framework", "models", "model", "pipelines", "research"}
+# Separators that join items of a skill list
+_LIST_SEPARATORS = re.compile(r"\s*(?:[,/&|;+]|\band\b|\bor\b)\s*", re.IGNORECASE)
+
+_aliases = {}
+
+def _load_aliases() -> dict:
+    aliases = {alias.lower(): canonical for alias, canonical in SKILL_ALIASES.items()}
+    if SKILL_ALIASES_PATH and os.path.exists(SKILL_ALIASES_PATH):
+        with open(SKILL_ALIASES_PATH) as f:
+            aliases.update({alias.strip().lower(): canonical for alias, canonical in json.load(f).items()})
+    # Canonical names are aliases of themselves
+    for canonical in set(aliases.values()) | set(KNOWN_SKILLS):
+        aliases.setdefault(canonical.lower(), canonical)
+    return aliases
+
+def _alias_table() -> dict:
+    global _aliases
+    if not _aliases:
+        _aliases = _load_aliases()
+    return _aliases
+
+# Canonical display name of a skill: "ML" -> "Machine Learning", "k8s" -> "Kubernetes";
+# unknown skills keep their spelling with whitespace collapsed
+def normalize_skill(skill: str) -> str:
+    cleaned = re.sub(r"\s+", " ", skill or "").strip()
+    return _alias_table().get(cleaned.lower(), cleaned)
+
+# Stable identifier of a skill's canonical form, safe for metadata keys ("C++" -> "c_plus_plus")
+def skill_id(skill: str) -> str:
+    canonical = normalize_skill(skill).lower().replace("+", " plus ").replace("#", " sharp ")
+    return re.sub(r"[^a-z0-9]+", "_", canonical).strip("_")
+
+# Canonical skills from a list or comma-separated string, de-duplicated in order
+def normalize_skills(skills) -> list:
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    result = {}
+    for skill in skills or []:
+        if skill and skill.strip():
+            canonical = normalize_skill(skill)
+            result.setdefault(skill_id(canonical), canonical)
+    return list(result.values())
+
+# Whether an ambiguous single-word alias at `match` is written the way people write the skill
+def _explicit_mention(text: str, match) -> bool:
+    token = match.group()
+    before, after = text[match.start() - 1:match.start()], text[match.end():match.end() + 1]
+    if before and before in "'\"`" and after == before:
+        return True
+    if token.lower() in CAPITALIZED_ABBREVIATIONS:
+        return False
+    if token.isupper() and len(token) > 1:
+        return True
+    sentence_start = not text[:match.start()].strip() or text[:match.start()].rstrip()[-1] in ".!?:;"
+    return token[:1].isupper() and not sentence_start
+
+# Whether the word at `index` is used as a skill: followed by a role word, or separated from an
+# already recognised skill only by a list separator ("Python, CV", "TS or JavaScript")
+def _skill_context(text: str, matches: list, index: int, skill_words: set) -> bool:
+    if index + 1 < len(matches) and matches[index + 1].group().lower() in SKILL_ROLE_WORDS:
+        return True
+    for step in (-1, 1):
+        neighbour = index + step
+        # "and" / "or" are words of their own; look past them
+        if 0 <= neighbour < len(matches) and matches[neighbour].group().lower() in ("and", "or"):
+            neighbour += step
+        if neighbour not in skill_words:
+            continue
+        left, right = sorted((matches[index], matches[neighbour]), key=lambda m: m.start())
+        if _LIST_SEPARATORS.fullmatch(text[left.end():right.start()]):
+            return True
+    return False
+
+# Known skills (aliases or canonical names) mentioned in free text, longest phrases first.
+# With include_ambiguous, AMBIGUOUS_ALIASES count however they are written.
+def find_skills_in_text(text: str, include_ambiguous: bool = False) -> list:
+    text = text or ""
+    matches = list(re.finditer(r"[A-Za-z0-9+#./-]+", text))
+    words = [match.group().lower() for match in matches]
+    found, used, deferred = {}, set(), []
+    aliases = _alias_table()
+    for size in (3, 2, 1):
+        for start in range(len(words) - size + 1):
+            span = range(start, start + size)
+            if used.intersection(span):
+                continue
+            phrase = " ".join(words[start:start + size])
+            if phrase not in aliases:
+                continue
+            if size == 1 and not include_ambiguous and phrase in AMBIGUOUS_ALIASES:
+                deferred.append(start)
+                continue
+            found.setdefault(skill_id(aliases[phrase]), aliases[phrase])
+            used.update(span)
+    # Ambiguous words are judged once the unambiguous skills around them are known
+    skill_words = set(used)
+    for index in deferred:
+        if _explicit_mention(text, matches[index]) or _skill_context(text, matches, index, skill_words):
+            found.setdefault(skill_id(aliases[words[index]]), aliases[words[index]])
+            skill_words.add(index)
+    return list(found.values())
+
+
+class SkillIndex:
+    """
+    Inverted index from canonical skill to the candidates that list it.
+
+    Candidate ids are mapped to dense integers in insertion order, so every
+    posting list stays sorted by appending; lookups intersect or union the
+    sorted arrays without touching vectors.
+    """
+
+    def __init__(self):
+        self._doc_ids = {}
+        self._candidate_ids = []
+        self._postings = {}
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def add(self, candidate_id: str, skills):
+        with self._lock:
+            if candidate_id in self._doc_ids:
+                return
+            doc = len(self._candidate_ids)
+            self._doc_ids[candidate_id] = doc
+            self._candidate_ids.append(candidate_id)
+            for skill in normalize_skills(skills):
+                key = skill_id(skill)
+                self._postings.setdefault(key, []).append(doc)
+                self._arrays.pop(key, None)
+
+    def add_many(self, candidate_ids: list, skills_lists: list):
+        for candidate_id, skills in zip(candidate_ids, skills_lists):
+            self.add(candidate_id, skills)
+
+    def _posting(self, skill: str) -> np.ndarray:
+        key = skill_id(skill)
+        array = self._arrays.get(key)
+        if array is None:
+            array = np.asarray(self._postings.get(key, []), dtype=np.int64)
+            self._arrays[key] = array
+        return array
+
+    def _resolve(self, docs: np.ndarray) -> list:
+        return [self._candidate_ids[doc] for doc in docs]
+
+    # Candidates listing every one of the skills
+    def candidates_with_all(self, skills) -> list:
+        skills = normalize_skills(skills)
+        if not skills:
+            return []
+        with self._lock:
+            postings = sorted((self._posting(skill) for skill in skills), key=len)
+            docs = postings[0]
+            for posting in postings[1:]:
+                if not len(docs):
+                    break
+                docs = np.intersect1d(docs, posting, assume_unique=True)
+            return self._resolve(docs)
+
+    # Candidates listing at least one of the skills
+    def candidates_with_any(self, skills) -> list:
+        skills = normalize_skills(skills)
+        if not skills:
+            return []
+        with self._lock:
+            docs = np.unique(np.concatenate([self._posting(skill) for skill in skills]))
+            return self._resolve(docs)
+
+    def __len__(self) -> int:
+        return len(self._candidate_ids)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = [len(posting) for posting in self._postings.values()]
+            return {
+                "candidates": len(self._candidate_ids),
+                "skills": len(self._postings),
+                "postings": sum(sizes),
+                "largest_posting": max(sizes) if sizes else 0
+            }
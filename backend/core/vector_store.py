@@ -0,0 +1,461 @@
+import os
+import json
+import random
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from core.similarity import top_k
+
+logger = logging.getLogger(__name__)
+
+# Fields a query can return, matching Chroma's `include` names
+QUERY_INCLUDE = ["metadatas", "distances"]
+# Distance spaces, as Chroma names them: squared L2, 1 - cosine similarity, 1 - inner product
+SPACES = ("l2", "cosine", "ip")
+
+
+class VectorStore(ABC):
+    """
+    Interface every vector store implements.
+
+    Mirrors the subset of Chroma's collection API the app uses, including its
+    result shapes: `query` and `query_batch` return {"ids": [[...]], ...} with
+    one inner list per query embedding, while `get` and `peek` return flat
+    lists. Distances are in the store's `space` (see SPACES).
+    """
+
+    name = "base"
+    space = "l2"
+
+    # Index parameters in effect, at least {"space": ...}
+    def index_config(self) -> dict:
+        return {"space": self.space}
+
+    @abstractmethod
+    def add(self, ids: list, embeddings: list, metadatas: list = None):
+        ...
+
+    @abstractmethod
+    def upsert(self, ids: list, embeddings: list, metadatas: list = None):
+        ...
+
+    # Merge `metadatas` into the stored metadata of existing ids
+    @abstractmethod
+    def update(self, ids: list, metadatas: list):
+        ...
+
+    def query(self, query_embedding, n_results: int = 5, where: dict = None, include: list = None, ids: list = None) -> dict:
+        return self.query_batch([query_embedding], n_results, where, include, ids)
+
+    @abstractmethod
+    def query_batch(self, query_embeddings: list, n_results: int = 5, where: dict = None, include: list = None,
+                    ids: list = None) -> dict:
+        ...
+
+    @abstractmethod
+    def get(self, ids: list = None, offset: int = 0, limit: int = None, include: list = None) -> dict:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    def peek(self, limit: int = 10) -> dict:
+        return self.get(limit=limit, include=["metadatas", "embeddings"])
+
+    @abstractmethod
+    def delete(self, ids: list):
+        ...
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    A Chroma collection (the original implementation), embedded or over HTTP.
+
+    With `retries` > 0, calls that fail on a transient transport error
+    (connection refused or reset, timeout, 5xx or 429 from the server) are retried
+    with jittered exponential backoff. Every call except `add` is
+    idempotent; `add` is only retried when the connection was never
+    established, since a retried add after a lost response would fail on
+    duplicate ids.
+
+    Calls block, retry backoff included; async callers run them with
+    asyncio.to_thread so a slow server never stalls the event loop.
+
+    With a `client`, a call that finds the collection gone (another process
+    rebuilt it under the same name, see chroma_client.migrate_collection)
+    re-resolves the collection by name once and retries.
+    """
+
+    name = "chroma"
+
+    def __init__(self, collection, retries: int = 0, backoff_seconds: float = 0.2, client=None):
+        self.collection = collection
+        self.collection_name = collection.name
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.client = client
+
+    @property
+    def space(self) -> str:
+        return self.index_config().get("space", "l2")
+
+    # HNSW parameters the collection was built with (space, max_neighbors, ef_construction, ef_search)
+    def index_config(self) -> dict:
+        hnsw = (self.collection.configuration or {}).get("hnsw") or {}
+        return {key: hnsw[key] for key in ("space", "max_neighbors", "ef_construction", "ef_search") if key in hnsw}
+
+    def _call(self, method: str, idempotent: bool = True, **kwargs):
+        attempt = 0
+        resolved = False
+        while True:
+            try:
+                return getattr(self.collection, method)(**kwargs)
+            except Exception as e:
+                if not resolved and self.client is not None and type(e).__name__ == "NotFoundError":
+                    logger.info(f"Chroma collection '{self.collection_name}' was replaced; reopening it")
+                    self.collection = self.client.get_collection(name=self.collection_name)
+                    resolved = True
+                    continue
+                if attempt >= self.retries or not is_transient_error(e, connect_only=not idempotent):
+                    raise
+                delay = random.uniform(0, self.backoff_seconds * 2 ** attempt)
+                logger.warning(f"Chroma {method} failed ({type(e).__name__}: {str(e)}); retry {attempt + 1} in {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    def add(self, ids: list, embeddings: list, metadatas: list = None):
+        self._call("add", idempotent=False, ids=ids, embeddings=embeddings, metadatas=metadatas)
+
+    def upsert(self, ids: list, embeddings: list, metadatas: list = None):
+        self._call("upsert", ids=ids, embeddings=embeddings, metadatas=metadatas)
+
+    def update(self, ids: list, metadatas: list):
+        self._call("update", ids=ids, metadatas=metadatas)
+
+    def query_batch(self, query_embeddings: list, n_results: int = 5, where: dict = None, include: list = None,
+                    ids: list = None) -> dict:
+        kwargs = {"include": include} if include else {}
+        if ids is not None:
+            kwargs["ids"] = ids
+        return self._call("query", query_embeddings=query_embeddings, n_results=n_results, where=where, **kwargs)
+
+    def get(self, ids: list = None, offset: int = 0, limit: int = None, include: list = None) -> dict:
+        return self._call("get", ids=ids, offset=offset or None, limit=limit, include=include or ["metadatas"])
+
+    def count(self) -> int:
+        return self._call("count")
+
+    def peek(self, limit: int = 10) -> dict:
+        return self._call("peek", limit=limit)
+
+    def delete(self, ids: list):
+        self._call("delete", ids=ids)
+
+
+# Transport-level failures worth retrying; connect_only limits this to requests that never reached the server
+_CONNECT_ERROR_NAMES = ("ConnectError", "ConnectTimeout", "ConnectionRefused", "PoolTimeout")
+_TRANSIENT_ERROR_NAMES = _CONNECT_ERROR_NAMES + ("ReadTimeout", "WriteTimeout", "ReadError", "RemoteProtocolError",
+                                                 "ConnectionReset", "ServiceUnavailable")
+
+# Server-side Chroma errors that are not worth retrying despite their 5xx code
+_PERMANENT_CHROMA_ERRORS = ("VersionMismatchError",)
+
+# HTTP status behind a failed Chroma request, if it can be told
+def _error_status(exc: Exception):
+    # ChromaError subclasses (InternalError, RateLimitError, ...) carry their status as code()
+    code = getattr(exc, "code", None)
+    if callable(code) and type(exc).__name__ not in _PERMANENT_CHROMA_ERRORS:
+        try:
+            return int(code())
+        except (TypeError, ValueError):
+            return None
+    # A response body that is not a ChromaError is re-raised as a plain Exception while
+    # handling httpx's HTTPStatusError, which keeps the response
+    for error in (exc, exc.__context__):
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is not None:
+            return status
+    return None
+
+def is_transient_error(exc: Exception, connect_only: bool = False) -> bool:
+    names = _CONNECT_ERROR_NAMES if connect_only else _TRANSIENT_ERROR_NAMES
+    if any(name in type(exc).__name__ for name in names):
+        return True
+    status = _error_status(exc)
+    return not connect_only and status is not None and (status >= 500 or status == 429)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact search over a float32 matrix, optionally memory-mapped from disk.
+
+    Queries are one matmul against every stored row (or only the rows passing
+    `where` / `ids`) followed by argpartition top-k, so results are exact and
+    there is no index to build. With a `path`, vectors live in
+    `<path>/vectors.f32` and are paged in by the OS; ids and metadata are kept
+    in memory and rewritten to `<path>/index.json` on every write, which suits
+    tests and small deployments rather than write-heavy ones. Without a path
+    the store is purely in-process. Having no index, the distance `space`
+    can be changed at any time.
+    """
+
+    name = "numpy"
+
+    def __init__(self, path: str = None, initial_capacity: int = 1024, space: str = "l2"):
+        if space not in SPACES:
+            raise ValueError(f"Unknown distance space '{space}' (expected one of {SPACES})")
+        self.space = space
+        self.path = path
+        self._lock = threading.RLock()
+        self._ids = []
+        self._rows = {}
+        self._metadatas = []
+        self._dim = None
+        self._matrix = None
+        self._sq_norms = np.zeros(0, dtype=np.float32)
+        self._initial_capacity = initial_capacity
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+
+    # ---- storage ----
+
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _load(self):
+        if not os.path.exists(self._index_path()):
+            return
+        with open(self._index_path()) as f:
+            index = json.load(f)
+        self._dim = index["dim"]
+        self._ids = index["ids"]
+        self._metadatas = index["metadatas"]
+        self._rows = {id_: row for row, id_ in enumerate(self._ids)}
+        capacity = os.path.getsize(self._vectors_path()) // (4 * self._dim)
+        self._matrix = np.memmap(self._vectors_path(), dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+        self._sq_norms = np.einsum("ij,ij->i", self._matrix, self._matrix)
+
+    def _save(self):
+        if not self.path or self._matrix is None:
+            return
+        self._matrix.flush()
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self._dim, "ids": self._ids, "metadatas": self._metadatas}, f)
+        os.replace(tmp_path, self._index_path())
+
+    # Make room for `needed` rows, doubling capacity so appends stay amortized O(1)
+    def _reserve(self, needed: int, dim: int):
+        if self._dim is None:
+            self._dim = dim
+        elif dim != self._dim:
+            raise ValueError(f"Embedding dimension {dim} does not match the store's dimension {self._dim}")
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, self._initial_capacity)
+        if self.path:
+            if self._matrix is not None:
+                self._matrix.flush()
+                del self._matrix
+            with open(self._vectors_path(), "ab") as f:
+                f.truncate(new_capacity * self._dim * 4)
+            self._matrix = np.memmap(self._vectors_path(), dtype=np.float32, mode="r+", shape=(new_capacity, self._dim))
+        else:
+            matrix = np.zeros((new_capacity, self._dim), dtype=np.float32)
+            if self._matrix is not None:
+                matrix[:capacity] = self._matrix
+            self._matrix = matrix
+        sq_norms = np.zeros(new_capacity, dtype=np.float32)
+        sq_norms[:len(self._sq_norms)] = self._sq_norms
+        self._sq_norms = sq_norms
+
+    def _write(self, ids: list, embeddings: list, metadatas: list, overwrite: bool):
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("Expected one embedding per id")
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock:
+            if not overwrite:
+                existing = [id_ for id_ in ids if id_ in self._rows]
+                if existing:
+                    raise ValueError(f"Ids already exist: {existing[:5]}")
+            new_ids = [id_ for id_ in dict.fromkeys(ids) if id_ not in self._rows]
+            self._reserve(len(self._ids) + len(new_ids), vectors.shape[1])
+            for id_ in new_ids:
+                self._rows[id_] = len(self._ids)
+                self._ids.append(id_)
+                self._metadatas.append(None)
+            rows = np.fromiter((self._rows[id_] for id_ in ids), dtype=np.int64, count=len(ids))
+            self._matrix[rows] = vectors
+            self._sq_norms[rows] = np.einsum("ij,ij->i", vectors, vectors)
+            for row, metadata in zip(rows, metadatas):
+                self._metadatas[row] = dict(metadata) if metadata else None
+            self._save()
+
+    # ---- writes ----
+
+    def add(self, ids: list, embeddings: list, metadatas: list = None):
+        self._write(ids, embeddings, metadatas, overwrite=False)
+
+    def upsert(self, ids: list, embeddings: list, metadatas: list = None):
+        self._write(ids, embeddings, metadatas, overwrite=True)
+
+    def update(self, ids: list, metadatas: list):
+        with self._lock:
+            for id_, metadata in zip(ids, metadatas):
+                row = self._rows.get(id_)
+                if row is not None and metadata:
+                    self._metadatas[row] = {**(self._metadatas[row] or {}), **metadata}
+            self._save()
+
+    # Swap-remove: the last row moves into each deleted slot, so the matrix stays dense
+    def delete(self, ids: list):
+        with self._lock:
+            for id_ in ids:
+                row = self._rows.pop(id_, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                if row != last:
+                    moved = self._ids[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._sq_norms[row] = self._sq_norms[last]
+                    self._ids[row] = moved
+                    self._metadatas[row] = self._metadatas[last]
+                    self._rows[moved] = row
+                self._ids.pop()
+                self._metadatas.pop()
+            self._save()
+
+    # ---- reads ----
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def _candidate_rows(self, where: dict = None, ids: list = None):
+        if ids is None:
+            rows = None if where is None else np.arange(len(self._ids))
+        else:
+            rows = np.array(sorted({self._rows[id_] for id_ in ids if id_ in self._rows}), dtype=np.int64)
+        if where is not None:
+            rows = rows[[matches_where(self._metadatas[row] or {}, where) for row in rows]] if len(rows) else rows
+        return rows
+
+    def query_batch(self, query_embeddings: list, n_results: int = 5, where: dict = None, include: list = None,
+                    ids: list = None) -> dict:
+        include = include or QUERY_INCLUDE
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        with self._lock:
+            result = {"ids": [], **{field: [] for field in include}}
+            count = len(self._ids)
+            rows = self._candidate_rows(where, ids)
+            if count == 0 or (rows is not None and not len(rows)):
+                for _ in range(len(queries)):
+                    for field in result:
+                        result[field].append([])
+                return result
+
+            matrix = self._matrix[:count] if rows is None else self._matrix[rows]
+            sq_norms = self._sq_norms[:count] if rows is None else self._sq_norms[rows]
+            distances = self._distances(queries, matrix, sq_norms)
+            best = top_k(-distances, n_results)
+
+            for q, positions in enumerate(best):
+                store_rows = positions if rows is None else rows[positions]
+                result["ids"].append([self._ids[row] for row in store_rows])
+                if "distances" in include:
+                    result["distances"].append(distances[q, positions].tolist())
+                if "metadatas" in include:
+                    result["metadatas"].append([self._metadatas[row] for row in store_rows])
+                if "embeddings" in include:
+                    result["embeddings"].append([np.array(self._matrix[row]) for row in store_rows])
+                if "documents" in include:
+                    result["documents"].append([None] * len(store_rows))
+            return result
+
+    # One matmul for every (query, row) pair, then converted to the store's distance space
+    def _distances(self, queries: np.ndarray, matrix: np.ndarray, sq_norms: np.ndarray) -> np.ndarray:
+        dots = queries @ matrix.T
+        if self.space == "ip":
+            return 1 - dots
+        query_sq_norms = np.einsum("ij,ij->i", queries, queries)
+        if self.space == "cosine":
+            norms = np.sqrt(query_sq_norms)[:, None] * np.sqrt(sq_norms)[None, :]
+            return 1 - np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+        # ||q - c||^2 = ||q||^2 + ||c||^2 - 2 q.c
+        return np.maximum(query_sq_norms[:, None] + sq_norms[None, :] - 2 * dots, 0)
+
+    def get(self, ids: list = None, offset: int = 0, limit: int = None, include: list = None) -> dict:
+        include = include or ["metadatas"]
+        with self._lock:
+            rows = range(len(self._ids)) if ids is None else [self._rows[id_] for id_ in ids if id_ in self._rows]
+            rows = list(rows)[offset:None if limit is None else offset + limit]
+            result = {"ids": [self._ids[row] for row in rows]}
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[row] for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = np.array(self._matrix[rows]) if rows else np.zeros((0, self._dim or 0), np.float32)
+            if "documents" in include:
+                result["documents"] = [None] * len(rows)
+            return result
+
+
+_COMPARATORS = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+# Evaluate a Chroma-style `where` filter ($and/$or, $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin) against one metadata dict
+def matches_where(metadata: dict, where: dict) -> bool:
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, target in condition.items():
+                if op not in _COMPARATORS:
+                    raise ValueError(f"Unsupported where operator '{op}'")
+                # Like Chroma, records without the field never match a condition on it
+                if key not in metadata:
+                    return False
+                if not _COMPARATORS[op](value, target):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+# Build the store selected by config: "chroma" (needs a chromadb client) or "numpy".
+# `hnsw` (space, max_neighbors, ef_construction, ef_search) only applies when Chroma creates the
+# collection; an existing collection keeps the parameters it was built with.
+def create_vector_store(kind: str, name: str, chroma_client=None, path: str = None, retries: int = 0,
+                        hnsw: dict = None) -> VectorStore:
+    kind = kind.lower()
+    if kind == "chroma":
+        configuration = {"hnsw": hnsw} if hnsw else None
+        return ChromaVectorStore(chroma_client.get_or_create_collection(name=name, configuration=configuration),
+                                 retries=retries, client=chroma_client)
+    if kind == "numpy":
+        return NumpyVectorStore(os.path.join(path, name) if path else None, space=(hnsw or {}).get("space", "l2"))
+    raise ValueError(f"Unknown vector store '{kind}' (expected 'chroma' or 'numpy')")
@@ -0,0 +1,46 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from core import llm
+from core.embeddings import warm_up_embeddings, get_embedding_model_status
+
+logger = logging.getLogger(__name__)
+
+# Load models in the background right after startup instead of on the first request
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+
+_warm_up_status = {"state": "pending", "started_at": None, "finished_at": None, "errors": []}
+
+# Background task: load the embedding backend and, if selected, the current local LLM
+async def warm_up_models():
+    _warm_up_status["state"] = "running"
+    _warm_up_status["started_at"] = datetime.now()
+    try:
+        await warm_up_embeddings()
+    except Exception as e:
+        logger.error(f"Embedding warm-up failed: {str(e)}")
+        _warm_up_status["errors"].append(f"embedding: {str(e)}")
+    if llm.current_provider == "local":
+        try:
+            await asyncio.to_thread(llm.get_llm)
+        except Exception as e:
+            logger.error(f"Local LLM warm-up failed: {str(e)}")
+            _warm_up_status["errors"].append(f"llm: {str(e)}")
+    _warm_up_status["state"] = "failed" if _warm_up_status["errors"] else "done"
+    _warm_up_status["finished_at"] = datetime.now()
+
+# Readiness: the embedding model is loaded and so is the selected local LLM, if any
+def get_readiness() -> dict:
+    embedding = get_embedding_model_status()
+    local_models = llm.get_loaded_local_models()
+    llm_ready = llm.current_provider != "local" or llm.current_model in local_models
+    return {
+        "ready": embedding["loaded"] and llm_ready,
+        "warm_up": dict(_warm_up_status),
+        "models": {
+            "embedding": embedding,
+            "llm": {**llm.get_current_model(), "loaded": llm_ready},
+            "local_llms_loaded": local_models
+        }
+    }
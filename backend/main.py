@@ -1,5 +1,9 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from datetime import datetime
 from sqlalchemy import inspect
 from db.db import engine, Base
@@ -10,7 +14,10 @@ from routes.choose_model import router as choose_model_router
 from routes.candidates import router as candidates_router
 from routes.match_score import router as match_router
 from routes.email import router as email_router
+from routes.metrics import router as metrics_router
 from core.logging import LoggingMiddleware
+from core.warmup import WARMUP_ON_STARTUP, warm_up_models, get_readiness
+from services.match_score import cancel_all_prematches, cancel_all_rematches
  
 
 load_dotenv()
@@ -18,7 +25,17 @@ inspector = inspect(engine)
 print(inspector.get_table_names())
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="AI HR Recruitment Agent")
+# Start model warm-up in the background so the server accepts requests immediately
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_task = asyncio.create_task(warm_up_models()) if WARMUP_ON_STARTUP else None
+    yield
+    if warm_up_task and not warm_up_task.done():
+        warm_up_task.cancel()
+    cancel_all_prematches()
+    cancel_all_rematches()
+
+app = FastAPI(title="AI HR Recruitment Agent", lifespan=lifespan)
 
 origins = ["*"]
 
@@ -38,9 +55,16 @@ app.include_router(choose_model_router, prefix="/model", tags=["Model Selection"
 app.include_router(candidates_router, prefix="/candidates", tags=["Candidates"])
 app.include_router(match_router, prefix="/match", tags=["Matching"])
 app.include_router(email_router, prefix="/email", tags=["Email"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
 
 @app.get("/")
 async def root():
     #Return with datetime
     current_time = datetime.now()
     return {"message": "Hello, World!", "datetime": current_time}
+
+# Readiness probe: 200 once the models needed to serve requests are loaded
+@app.get("/ready")
+async def ready():
+    readiness = get_readiness()
+    return JSONResponse(content=jsonable_encoder(readiness), status_code=200 if readiness["ready"] else 503)
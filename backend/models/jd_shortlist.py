@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from db.db import Base
+from datetime import datetime
+
+class JDShortlist(Base):
+    __tablename__ = 'jd_shortlists'
+    __table_args__ = (
+        UniqueConstraint('jd_id', 'candidate_id', name='uq_jd_shortlist_candidate'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    jd_id = Column(Integer, index=True, nullable=False)
+    candidate_id = Column(String, nullable=False)
+    jd_hash = Column(String, nullable=False)
+    score = Column(Integer, nullable=False)
+    hybrid_score = Column(Integer)
+    reason = Column(Text)
+    scored_by = Column(String)  # 'llm' or 'hybrid'
+    name = Column(String)
+    skills = Column(Text)
+    experience = Column(String)
+    email = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
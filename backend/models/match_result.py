@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint, Index
+from db.db import Base
+from datetime import datetime
+
+class MatchResult(Base):
+    __tablename__ = 'match_results'
+    __table_args__ = (
+        # One stored score per pair for a given scorer and JD content
+        UniqueConstraint('jd_id', 'candidate_id', 'provider', 'model', 'scorer_version', 'jd_hash', name='uq_match_result_key'),
+        Index('ix_match_results_jd_score', 'jd_id', 'score'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    jd_id = Column(Integer, index=True, nullable=False)
+    candidate_id = Column(String, nullable=False)
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    scorer_version = Column(String, nullable=False)
+    jd_hash = Column(String, nullable=False)
+    score = Column(Integer)
+    hybrid_score = Column(Integer)
+    reason = Column(Text)
+    scored_by = Column(String)  # 'llm' or 'hybrid'
+    name = Column(String)
+    skills = Column(Text)
+    experience = Column(String)
+    email = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,6 +1,7 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
-from services.candidates import fetch_candidates_from_sources, store_candidates_embeddings, search_candidates_by_query
-from core.chroma_client import get_candidate_count, peek_candidates
+from services.candidates import fetch_candidates_from_sources, store_candidates_embeddings, search_candidates_by_query, backfill_candidate_metadata
+from core.chroma_client import get_candidate_count, peek_candidates, migrate_collection, CANDIDATE_COLLECTION
 from schema.candidates import StoreRequest
 
 router = APIRouter()
@@ -18,7 +19,7 @@ async def fetch_candidates():
 @router.post("/store")
 async def store_candidates(request: StoreRequest):
     try:
-        candidates = request.candidates if request.candidates else fetch_candidates_from_sources()
+        candidates = [c.model_dump() for c in request.candidates] if request.candidates else fetch_candidates_from_sources()
         await store_candidates_embeddings(candidates)
         return {"message": "Candidates embeddings stored successfully"}
     except Exception as e:
@@ -28,11 +29,28 @@ async def store_candidates(request: StoreRequest):
 async def store_from_fetch():
     try:
         candidates = fetch_candidates_from_sources()
-        store_candidates_embeddings(candidates)
+        await store_candidates_embeddings(candidates)
         return {"message": f"Stored {len(candidates)} candidates from sources"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Add filterable skill metadata to candidates stored before it existed
+@router.post("/reindex")
+async def reindex_candidates():
+    try:
+        updated = await asyncio.to_thread(backfill_candidate_metadata)
+        return {"message": f"Updated metadata for {updated} candidates"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Rebuild the candidate collection with the configured HNSW parameters (pause ingestion first)
+@router.post("/migrate_index")
+async def migrate_candidate_index():
+    try:
+        return await asyncio.to_thread(migrate_collection, CANDIDATE_COLLECTION)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Search candidates by query    
 @router.get("/search")
 async def search_candidates(query: str, n_results: int = 5):
@@ -60,7 +78,7 @@ async def search_candidates(query: str, n_results: int = 5):
 @router.get("/count")
 async def get_candidates_count():
     try:
-        count = get_candidate_count()
+        count = await asyncio.to_thread(get_candidate_count)
         return {"count": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -68,7 +86,7 @@ async def get_candidates_count():
 @router.get("/peek")
 async def peek_candidates_data(n: int = 5):
     try:
-        data = peek_candidates(n)
+        data = await asyncio.to_thread(peek_candidates, n)
         return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, UploadFile, HTTPException
 from fastapi.responses import StreamingResponse
-from core.llm import set_model, get_llm, get_available_models, get_current_model, current_provider
+from core.llm import set_model, get_llm, get_available_models, get_current_model, current_provider, get_local_model_pool_stats, unload_local_model
 from pydantic import BaseModel
 from schema.choose_model import SetModelRequest
 
@@ -46,6 +46,18 @@ async def get_current_model_endpoint():
 async def get_available_models_endpoint():
     return {"providers": get_available_models()}
 
+# Inspect loaded local models with their size and load time
+@router.get("/loaded")
+async def get_loaded_models():
+    return get_local_model_pool_stats()
+
+# Unload a local model to free its memory
+@router.delete("/loaded/{model:path}")
+async def unload_model(model: str):
+    if not unload_local_model(model):
+        raise HTTPException(status_code=404, detail=f"Model '{model}' is not loaded")
+    return {"success": True, "message": f"Model {model} unloaded", "loaded": get_local_model_pool_stats()}
+
 @router.post("/stream-chat")
 async def stream_chat(request: dict):
     from core.llm import current_provider
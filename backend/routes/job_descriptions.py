@@ -1,11 +1,13 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from typing import Optional
 from schema.job_descriptions import JobDescriptionRequest, GenerateJDRequest
 from db.db import get_db
 from sqlalchemy.orm import Session
 from services.job_descriptions import fetch_jd_titles, generate_job_description_from_text, extract_text, generate_job_llm, save_structured_jd
-from core.chroma_client import get_jd_count as chroma_get_jd_count, peek_jds
+from core.chroma_client import get_jd_count as chroma_get_jd_count, peek_jds, migrate_collection, JD_COLLECTION
 from models.job_descriptions import JobDescription
+from services.match_score import schedule_prematch
 
 router = APIRouter()
 
@@ -18,9 +20,11 @@ async def upload_job_description(
 ):
     if text:
         jd_result = await generate_job_description_from_text(text, db)
+        schedule_prematch(jd_result["jd_id"])
         return {"job_description": jd_result}
     elif file:
         jd_result = await extract_text(file, db)
+        schedule_prematch(jd_result["jd_id"])
         return {"job_description": jd_result}
     else:
         return {"error": "No input provided. Please provide either text or a file."}
@@ -47,12 +51,14 @@ async def generate_job_description(request: GenerateJDRequest):
 @router.post("/finalize")
 async def finalize_jd(structured_jd: dict, db: Session = Depends(get_db)):
     jd_result = await save_structured_jd(structured_jd, db)
+    # Matching is almost always the next step; start it in the background (MATCH_PREMATCH_ENABLED)
+    schedule_prematch(jd_result["jd_id"])
     return jd_result
 
 @router.get("/count")
 async def get_jd_count():
     try:
-        count = chroma_get_jd_count()
+        count = await asyncio.to_thread(chroma_get_jd_count)
         return {"count": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -60,11 +66,19 @@ async def get_jd_count():
 @router.get("/peek")
 async def peek_jd_data(n: int = 5):
     try:
-        data = peek_jds(n)
+        data = await asyncio.to_thread(peek_jds, n)
         return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Rebuild the JD collection with the configured HNSW parameters (pause uploads first)
+@router.post("/migrate_index")
+async def migrate_jd_index():
+    try:
+        return await asyncio.to_thread(migrate_collection, JD_COLLECTION)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Get job description titles for UI
 @router.get("/titles")
 async def get_jd_titles(db: Session = Depends(get_db)):
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
-from services.match_score import match_jd_to_candidates
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from fastapi.responses import StreamingResponse
+from services.match_score import match_jd_to_candidates, stream_match_jd_to_candidates, find_candidates_for_jd, SCORER_VERSION
+from services.match_results import page_matches, get_shortlist
+from services.job_descriptions import get_jd_by_id
+from core import llm
 from schema.match_score import ScoreRequest
 from db.db import get_db
 from sqlalchemy.orm import Session
+import json
+import time
 
 router = APIRouter()
 
@@ -13,4 +20,70 @@ async def score_candidates(request: ScoreRequest, db: Session = Depends(get_db))
         matches = await match_jd_to_candidates(request.title, request.n_results, db)
         return {"matches": matches}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Streaming variant: one "match" event per candidate as soon as it is scored, then a "summary" event
+@router.post("/score/stream")
+async def stream_score_candidates(request: ScoreRequest, db: Session = Depends(get_db)):
+    start = time.perf_counter()
+    # Resolve the JD and candidates up front so lookup failures still return an HTTP error
+    try:
+        jd, ids, metadatas, distances = await find_candidates_for_jd(request.title, request.n_results, db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def generate():
+        scored = failed = llm_scored = 0
+        try:
+            async for match in stream_match_jd_to_candidates(jd, ids, metadatas, distances, db):
+                if match.get("error"):
+                    failed += 1
+                else:
+                    scored += 1
+                if match.get("scored_by") == "llm":
+                    llm_scored += 1
+                yield _sse("match", match)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+        yield _sse("summary", {
+            "total": len(ids),
+            "scored": scored,
+            "failed": failed,
+            "llm_scored": llm_scored,
+            "elapsed_seconds": round(time.perf_counter() - start, 3)
+        })
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+# Page through stored matches for a JD, best score first.
+# Defaults to the current provider/model; only scores for the JD's current content are returned.
+@router.get("/results/{jd_id}")
+async def get_match_results(
+    jd_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    jd = get_jd_by_id(jd_id, db)
+    if not jd:
+        raise HTTPException(status_code=404, detail=f"Job description {jd_id} not found")
+    try:
+        return page_matches(db, jd, provider or llm.current_provider, model or llm.current_model, SCORER_VERSION, offset, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Materialized top candidates for a JD, kept current by matching and by candidate ingestion
+@router.get("/shortlist/{jd_id}")
+async def get_jd_shortlist(jd_id: int, db: Session = Depends(get_db)):
+    jd = get_jd_by_id(jd_id, db)
+    if not jd:
+        raise HTTPException(status_code=404, detail=f"Job description {jd_id} not found")
+    try:
+        return {"jd_id": jd_id, "matches": get_shortlist(db, jd)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,51 @@
+import asyncio
+from fastapi import APIRouter
+from core.embeddings import get_embedding_cache_stats, get_embedding_scheduler_stats
+from core.llm import get_llm_client_stats
+from core.llm_invoke import get_llm_cache_stats, get_llm_token_stats
+from core.llm_scheduler import get_scheduler_stats
+from core.llm_hedging import get_hedging_stats
+from core.chroma_client import index_status, CANDIDATE_COLLECTION, JD_COLLECTION
+from services.candidates import get_search_cache_stats, get_skill_index_stats
+from services.match_score import get_incremental_match_stats, get_prematch_stats
+
+router = APIRouter()
+
+# Embedding cache hit/miss counters and micro-batching histograms
+@router.get("/embeddings")
+async def embedding_metrics():
+    return {
+        "cache": get_embedding_cache_stats(),
+        "scheduler": get_embedding_scheduler_stats()
+    }
+
+
+# LLM client reuse, response cache hit rates, per-provider queue waits, hedging latencies and token usage
+@router.get("/llm")
+async def llm_metrics():
+    return {
+        "clients": get_llm_client_stats(),
+        "response_cache": get_llm_cache_stats(),
+        "scheduler": get_scheduler_stats(),
+        "hedging": get_hedging_stats(),
+        "tokens": get_llm_token_stats()
+    }
+
+
+# Semantic cache of parsed candidate search queries, the skill inverted index and vector index parameters
+@router.get("/search")
+async def search_metrics():
+    return {
+        "query_cache": get_search_cache_stats(),
+        "skill_index": get_skill_index_stats(),
+        "vector_store": {name: await asyncio.to_thread(index_status, name) for name in (CANDIDATE_COLLECTION, JD_COLLECTION)}
+    }
+
+
+# Incremental re-matching of newly ingested candidates and background pre-matching of new JDs
+@router.get("/matching")
+async def matching_metrics():
+    return {
+        "incremental": get_incremental_match_stats(),
+        "prematch": get_prematch_stats()
+    }
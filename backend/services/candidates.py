@@ -1,10 +1,41 @@
 from utilities.mock_sources import fetch_linkedin, fetch_naukri
-from core.embeddings import generate_embedding
-from core.chroma_client import add_candidate, search_candidates
+from core.embeddings import agenerate_embedding, agenerate_embeddings
+from core.chroma_client import add_candidates, search_candidates, get_candidates_page, update_candidate_metadatas, get_candidate_count
+from core.semantic_cache import SemanticCache
+from core.skills import SkillIndex, normalize_skills, skill_id, find_skills_in_text
+import asyncio
+import os
+import re
+import time
 import uuid
 import json
+import threading
 from langchain_core.messages import SystemMessage, HumanMessage
-from core.llm import get_llm
+from core.llm_invoke import invoke_llm, is_json_reply, strip_json_fence
+from services.match_score import schedule_rematch
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Reuse the parse of a near-paraphrased query instead of calling the LLM again
+SEARCH_SEMANTIC_CACHE_ENABLED = os.getenv("SEARCH_SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEARCH_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEARCH_SEMANTIC_CACHE_SIZE = int(os.getenv("SEARCH_SEMANTIC_CACHE_SIZE", "1000"))
+
+_query_cache = SemanticCache(max_entries=SEARCH_SEMANTIC_CACHE_SIZE, threshold=SEARCH_SEMANTIC_CACHE_THRESHOLD)
+
+# Skill-constrained searches restrict Chroma to the skill index's posting list when it has at most this many ids
+SKILL_INDEX_MAX_ID_FILTER = int(os.getenv("SKILL_INDEX_MAX_ID_FILTER", "10000"))
+
+# Other uvicorn workers ingest into the same Chroma collection without touching this process's index,
+# so at most this often the index compares its size with the collection and picks up new candidates
+SKILL_INDEX_REFRESH_SECONDS = float(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "30"))
+
+# Built from Chroma on first use, maintained on ingest and refreshed from Chroma
+_skill_index = SkillIndex()
+_skill_index_built = False
+_skill_index_checked_at = 0.0
+_skill_index_lock = threading.Lock()
 
 # Fetch candidates from multiple external sources
 def fetch_candidates_from_sources():
@@ -16,25 +47,101 @@ def fetch_candidates_from_sources():
         all_candidates.extend(candidates)
     return all_candidates
 
-# Store candidates embeddings in ChromaDB
-def store_candidates_embeddings(candidates: list):
-    for candidate in candidates:
-        exp_str = candidate['experience']
-        exp_num = int(exp_str.split()[0]) if exp_str else 0
-        candidate_text = f"{candidate['name']} skills: {', '.join(candidate['skills'])} experience: {candidate['experience']} years"
-        embedding = generate_embedding(candidate_text)
-        candidate_id = str(uuid.uuid4())
-        metadata = {
-            "name": candidate['name'],
-            "skills": ', '.join(candidate['skills']),
-            "experience": exp_num,
-            "experience_str": exp_str,
-            "email": candidate['email']
-        }
-        add_candidate(candidate_id, embedding, metadata)
+# Number of candidates embedded and written per chunk during ingestion
+CANDIDATE_INGEST_CHUNK_SIZE = int(os.getenv("CANDIDATE_INGEST_CHUNK_SIZE", "256"))
+
+# Yield fixed-size lists from any iterable without materialising it
+def _chunked(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Build the text that gets embedded for a candidate
+def _candidate_text(candidate: dict) -> str:
+    return f"{candidate['name']} skills: {', '.join(candidate['skills'])} experience: {candidate['experience']} years"
+
+# Chroma metadata values must be scalars, so each canonical skill becomes its own boolean key
+# ("Spring Boot" -> "skill_spring_boot", "ML" -> "skill_machine_learning") that `where` clauses can filter on
+def skill_key(skill: str) -> str:
+    return "skill_" + skill_id(skill)
+
+def _skill_flags(skills) -> dict:
+    return {skill_key(skill): True for skill in normalize_skills(skills)}
+
+# Build the metadata stored alongside the candidate embedding
+def _candidate_metadata(candidate: dict) -> dict:
+    exp_str = candidate['experience']
+    exp_num = int(exp_str.split()[0]) if exp_str else 0
+    return {
+        "name": candidate['name'],
+        "skills": ', '.join(candidate['skills']),
+        "experience": exp_num,
+        "experience_str": exp_str,
+        "email": candidate['email'],
+        **_skill_flags(candidate['skills'])
+    }
+
+# Add skill flags to candidates stored before they existed; returns the number updated
+def backfill_candidate_metadata(page_size: int = CANDIDATE_INGEST_CHUNK_SIZE) -> int:
+    updated = offset = 0
+    while True:
+        page = get_candidates_page(offset, page_size)
+        if not page['ids']:
+            return updated
+        ids, metadatas = [], []
+        for candidate_id, metadata in zip(page['ids'], page['metadatas']):
+            flags = _skill_flags(metadata.get('skills', ''))
+            if any(key not in metadata for key in flags):
+                ids.append(candidate_id)
+                metadatas.append({**metadata, **flags})
+        update_candidate_metadatas(ids, metadatas)
+        updated += len(ids)
+        offset += len(page['ids'])
+
+# Store candidates embeddings in ChromaDB, streaming them through in chunks.
+# Once all are stored, the new candidates are matched against the stored JDs in the background;
+# only their ids are kept across chunks, so memory stays bounded by the chunk.
+async def store_candidates_embeddings(candidates, chunk_size: int = CANDIDATE_INGEST_CHUNK_SIZE) -> int:
+    stored = 0
+    new_ids = []
+    for chunk in _chunked(candidates, chunk_size):
+        embeddings = await agenerate_embeddings([_candidate_text(c) for c in chunk])
+        candidate_ids = [str(uuid.uuid4()) for _ in chunk]
+        metadatas = [_candidate_metadata(c) for c in chunk]
+        await asyncio.to_thread(add_candidates, candidate_ids, embeddings, metadatas)
+        if _skill_index_built:
+            _skill_index.add_many(candidate_ids, [c['skills'] for c in chunk])
+        stored += len(chunk)
+        new_ids.extend(candidate_ids)
+    schedule_rematch(new_ids)
+    return stored
+
+# Numbers ("4 years") and skills ("python" vs "java") in a query must match exactly for a cached parse
+# to be reused; near-identical embeddings alone would hand back another query's skill filter
+def _query_guard(query: str) -> tuple:
+    numbers = tuple(sorted(re.findall(r"\d+(?:\.\d+)?", query)))
+    skills = tuple(sorted(skill_id(skill) for skill in find_skills_in_text(query, include_ambiguous=True)))
+    return numbers, skills
+
+def get_search_cache_stats() -> dict:
+    return {"enabled": SEARCH_SEMANTIC_CACHE_ENABLED, **_query_cache.stats()}
 
 # Job description search to find matching candidates
-async def parse_search_query(query: str):
+async def parse_search_query(query: str, query_embedding: list = None):
+    if SEARCH_SEMANTIC_CACHE_ENABLED:
+        if query_embedding is None:
+            query_embedding = await agenerate_embedding(query)
+        guard = _query_guard(query)
+        cached = _query_cache.lookup(query_embedding, guard)
+        if cached is not None:
+            return cached
+
+    start = time.perf_counter()
     prompt = f"""
     Parse the following search query for candidates into structured data.
     Identify and extract:
@@ -47,59 +154,91 @@ async def parse_search_query(query: str):
     Return ONLY valid JSON with keys: skills (list), min_experience (int or null), other_requirements (string).
     Example: {{"skills": ["Python", "Machine Learning"], "min_experience": 3, "other_requirements": "remote"}}
     """
-    llm = get_llm()
     messages = [
         SystemMessage(content="You are a helpful assistant that parses search queries into structured data. Always respond with valid JSON only."),
         HumanMessage(content=prompt)
     ]
-    response = await llm.ainvoke(messages)
-    result = response.content.strip()
+    response = await invoke_llm(messages, call_site="parse_search_query", validate=is_json_reply)
     # Remove markdown if present
-    if result.startswith('```json'):
-        result = result[7:]
-    if result.endswith('```'):
-        result = result[:-3]
-    result = result.strip()
+    result = strip_json_fence(response)
     try:
         parsed = json.loads(result)
+        if SEARCH_SEMANTIC_CACHE_ENABLED:
+            _query_cache.store(query_embedding, parsed, guard, time.perf_counter() - start)
         return parsed
     except:
-        # Fallback: simple parsing
-        skills = []
+        # Fallback: skills from the skill taxonomy, a bare number as minimum experience
+        skills = find_skills_in_text(query)
         min_exp = None
         other = query
-        words = query.lower().split()
-        known_skills = ['python', 'java', 'react', 'javascript', 'typescript', 'machine learning', 'ml', 'ai', 'data science', 'aws', 'spring boot', 'microservices', 'pandas', 'scikit-learn', 'redux', 'ui/ux']
-        for word in words:
-            if word in known_skills:
-                skills.append(word.capitalize() if word != 'ml' else 'Machine Learning')
-            elif word.isdigit():
+        for word in query.lower().split():
+            if word.isdigit():
                 min_exp = int(word)
         return {"skills": skills, "min_experience": min_exp, "other_requirements": other}
 
-# Search candidates based on parsed query
-async def search_candidates_by_query(query: str, n_results=5):
-    parsed = await parse_search_query(query)
-    query_embedding = generate_embedding(query)
-    print("Parsed Query:", parsed, "Embedding Length:", len(query_embedding))
-    results = search_candidates(query_embedding, n_results * 2)  # get more to filter
-    # Filter results based on parsed skills
-    filtered_results = {'ids': [[]], 'metadatas': [[]], 'distances': [[]]}
-    if results['ids']:
-        ids = results['ids'][0]
-        metadatas = results['metadatas'][0]
-        distances = results['distances'][0] if 'distances' in results and results['distances'] else [None] * len(ids)
-        for i in range(len(ids)):
-            metadata = metadatas[i]
-            skills = metadata['skills'].lower()
-            include = True
-            if parsed.get('skills'):
-                if not any(skill.lower() in skills for skill in parsed['skills']):
-                    include = False
-            if include:
-                filtered_results['ids'][0].append(ids[i])
-                filtered_results['metadatas'][0].append(metadatas[i])
-                filtered_results['distances'][0].append(distances[i])
-                if len(filtered_results['ids'][0]) >= n_results:
+# Load stored candidates' skills into the inverted index: everything on first use, then again whenever
+# the collection holds candidates the index has not seen (e.g. ingested by another worker).
+# SkillIndex.add skips known ids, so a rescan only adds the missing ones.
+def _ensure_skill_index(page_size: int = CANDIDATE_INGEST_CHUNK_SIZE) -> SkillIndex:
+    global _skill_index_built, _skill_index_checked_at
+    if _skill_index_built and time.monotonic() - _skill_index_checked_at < SKILL_INDEX_REFRESH_SECONDS:
+        return _skill_index
+    with _skill_index_lock:
+        if _skill_index_built and time.monotonic() - _skill_index_checked_at < SKILL_INDEX_REFRESH_SECONDS:
+            return _skill_index
+        if not _skill_index_built or get_candidate_count() != len(_skill_index):
+            offset = 0
+            while True:
+                page = get_candidates_page(offset, page_size)
+                if not page['ids']:
                     break
-    return filtered_results
+                _skill_index.add_many(page['ids'], [metadata.get('skills', '') for metadata in page['metadatas']])
+                offset += len(page['ids'])
+            _skill_index_built = True
+        _skill_index_checked_at = time.monotonic()
+    return _skill_index
+
+def get_skill_index_stats() -> dict:
+    return {"built": _skill_index_built, "refresh_seconds": SKILL_INDEX_REFRESH_SECONDS, **_skill_index.stats()}
+
+# Translate a parsed query into a Chroma `where` clause: any of the skills, at least min_experience years
+def build_candidate_where(parsed: dict, include_skills: bool = True):
+    conditions = []
+    skills = normalize_skills([skill for skill in parsed.get('skills') or [] if isinstance(skill, str)]) if include_skills else []
+    skill_conditions = [{skill_key(skill): True} for skill in skills]
+    if len(skill_conditions) == 1:
+        conditions.append(skill_conditions[0])
+    elif skill_conditions:
+        conditions.append({"$or": skill_conditions})
+    try:
+        min_experience = int(float(parsed.get('min_experience')))
+    except (TypeError, ValueError):
+        min_experience = None
+    if min_experience:
+        conditions.append({"experience": {"$gte": min_experience}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+# Search candidates based on parsed query; skill and experience filters run inside Chroma
+async def search_candidates_by_query(query: str, n_results=5):
+    query_embedding = await agenerate_embedding(query)
+    parsed = await parse_search_query(query, query_embedding)
+    empty = {'ids': [[]], 'metadatas': [[]], 'distances': [[]]}
+    skills = [skill for skill in parsed.get('skills') or [] if isinstance(skill, str)]
+    ids = None
+    if skills:
+        # Narrow to candidates with any requested skill before the vector search
+        # The first build (and a refresh) scans the collection; keep it off the event loop
+        skill_index = await asyncio.to_thread(_ensure_skill_index)
+        ids = skill_index.candidates_with_any(skills)
+        if not ids:
+            return empty
+        if len(ids) > SKILL_INDEX_MAX_ID_FILTER:
+            ids = None
+    where = build_candidate_where(parsed, include_skills=ids is None)
+    logger.info(f"Parsed query: {parsed}, where: {where}, id filter: {len(ids) if ids is not None else None}")
+    results = await asyncio.to_thread(search_candidates, query_embedding, n_results, where=where, ids=ids)
+    if not results['ids']:
+        return empty
+    return results
@@ -1,4 +1,4 @@
-from core.llm import get_llm
+from core.llm_invoke import invoke_llm
 from langchain_core.messages import SystemMessage, HumanMessage
 from dotenv import load_dotenv
 import smtplib
@@ -45,13 +45,12 @@ async def generate_candidate_email(candidate_name: str, job_role: str, company_n
 
     Write the email body only.
     """
-    llm = get_llm()
     messages = [
         SystemMessage(content="You are an HR assistant generating professional emails."),
         HumanMessage(content=prompt)
     ]
-    response = await llm.ainvoke(messages)
-    return response.content.strip()
+    response = await invoke_llm(messages, call_site="generate_candidate_email")
+    return response.strip()
 
 # Generate HR email summarizing shortlisted candidate
 async def generate_hr_email(candidate_name: str, job_role: str, score: int, reason: str) -> str:
@@ -70,10 +69,9 @@ async def generate_hr_email(candidate_name: str, job_role: str, score: int, reas
 
     Write the email body only.
     """
-    llm = get_llm()
     messages = [
         SystemMessage(content="You are an HR assistant generating professional emails."),
         HumanMessage(content=prompt)
     ]
-    response = await llm.ainvoke(messages)
-    return response.content.strip()
+    response = await invoke_llm(messages, call_site="generate_hr_email")
+    return response.strip()
@@ -2,9 +2,10 @@ from sqlalchemy.orm import Session
 from fastapi import UploadFile
 from models.job_descriptions import JobDescription
 from utilities.jd_parser import generate_structured_jd, extract_text_from_file
-from core.embeddings import generate_embedding
+from core.embeddings import agenerate_embedding
 from core.chroma_client import add_jd
 import uuid
+import asyncio
 
 #Input from text
 async def generate_job_description_from_text(text: str, db: Session) -> dict:
@@ -18,13 +19,13 @@ async def generate_job_description_from_text(text: str, db: Session) -> dict:
 
     # Embed and store in Chroma
     jd_text = structured_jd.get('job_description', text)
-    embedding = generate_embedding(jd_text)
+    embedding = await agenerate_embedding(jd_text)
     metadata = {
         "source": "ai_generated",
         "length": len(jd_text),
         "jd_id": jd_id
     }
-    add_jd(str(uuid.uuid4()), embedding, metadata)
+    await asyncio.to_thread(add_jd, str(uuid.uuid4()), embedding, metadata)
     
     return {
         "jd_id": jd_id,
@@ -47,13 +48,13 @@ async def extract_text(file: UploadFile, db: Session) -> dict:
 
     # Embed and store in Chroma
     jd_text = structured_jd.get('job_description', text)
-    embedding = generate_embedding(jd_text)
+    embedding = await agenerate_embedding(jd_text)
     metadata = {
         "source": "ai_generated",
         "length": len(jd_text),
         "jd_id": jd_id
     }
-    add_jd(str(uuid.uuid4()), embedding, metadata)
+    await asyncio.to_thread(add_jd, str(uuid.uuid4()), embedding, metadata)
     
     return {
         "jd_id": jd_id,
@@ -75,13 +76,13 @@ async def save_structured_jd(structured_jd: dict, db: Session) -> dict:
     jd_id = jd_db.id
 
     jd_text = structured_jd.get('job_description', '')
-    embedding = generate_embedding(jd_text)
+    embedding = await agenerate_embedding(jd_text)
     metadata = {
         "source": "generated",
         "length": len(jd_text),
         "jd_id": jd_id
     }
-    add_jd(str(uuid.uuid4()), embedding, metadata)
+    await asyncio.to_thread(add_jd, str(uuid.uuid4()), embedding, metadata)
     
     return {
         "jd_id": jd_id,
@@ -104,4 +105,8 @@ def get_jd_by_title(title: str, db: Session = None):
     jd = db.query(JobDescription).filter(JobDescription.job_role.ilike(f'%{title}%')).first()
     if close_session:
         db.close()
-    return jd
\ No newline at end of file
+    return jd
+
+# Fetch job description by id
+def get_jd_by_id(jd_id: int, db: Session):
+    return db.query(JobDescription).filter(JobDescription.id == jd_id).first()
@@ -0,0 +1,168 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models.match_result import MatchResult
+from models.jd_shortlist import JDShortlist
+import hashlib
+import os
+
+# Write match scores through to the match_results table and reuse them for unchanged pairs
+MATCH_RESULT_STORE_ENABLED = os.getenv("MATCH_RESULT_STORE_ENABLED", "true").lower() == "true"
+# Candidates kept in each JD's materialized shortlist
+MATCH_SHORTLIST_SIZE = int(os.getenv("MATCH_SHORTLIST_SIZE", "20"))
+
+# Content hash of the JD fields scoring depends on; editing any of them invalidates stored scores
+def jd_hash(jd) -> str:
+    parts = [getattr(jd, name, None) or "" for name in ("job_description", "required_skills", "experience_range")]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+def _key_filter(query, jd, provider: str, model: str, scorer_version: str):
+    return query.filter(
+        MatchResult.jd_id == jd.id,
+        MatchResult.provider == provider,
+        MatchResult.model == model,
+        MatchResult.scorer_version == scorer_version,
+        MatchResult.jd_hash == jd_hash(jd)
+    )
+
+def to_match(row: MatchResult, rank: int = None) -> dict:
+    return {
+        "rank": rank,
+        "candidate_id": row.candidate_id,
+        "name": row.name,
+        "skills": row.skills,
+        "experience": row.experience,
+        "email": row.email,
+        "score": row.score,
+        "reason": row.reason,
+        "hybrid_score": row.hybrid_score,
+        "scored_by": row.scored_by,
+        "cached": True
+    }
+
+# Stored LLM scores for these candidates under the current JD content, provider, model and scorer
+def load_llm_matches(db: Session, jd, candidate_ids: list, provider: str, model: str, scorer_version: str) -> dict:
+    if not candidate_ids:
+        return {}
+    rows = _key_filter(db.query(MatchResult), jd, provider, model, scorer_version).filter(
+        MatchResult.candidate_id.in_(candidate_ids),
+        MatchResult.scored_by == "llm"
+    ).all()
+    return {row.candidate_id: row for row in rows}
+
+# Upsert freshly computed matches; failed scorings are not stored so they are retried next time.
+# A stored LLM score is never downgraded to a hybrid-only one; only its hybrid_score is refreshed.
+def save_matches(db: Session, jd, matches: list, provider: str, model: str, scorer_version: str):
+    matches = [m for m in matches if not m.get("error") and not m.get("cached")]
+    if not matches:
+        return
+    existing = {
+        row.candidate_id: row for row in _key_filter(db.query(MatchResult), jd, provider, model, scorer_version).filter(
+            MatchResult.candidate_id.in_([m["candidate_id"] for m in matches])
+        ).all()
+    }
+    digest = jd_hash(jd)
+    for match in matches:
+        row = existing.get(match["candidate_id"])
+        if row is not None and row.scored_by == "llm" and match.get("scored_by") != "llm":
+            row.hybrid_score = match.get("hybrid_score")
+            continue
+        if row is None:
+            row = MatchResult(
+                jd_id=jd.id, candidate_id=match["candidate_id"], provider=provider, model=model,
+                scorer_version=scorer_version, jd_hash=digest
+            )
+            db.add(row)
+        row.score = match["score"]
+        row.hybrid_score = match.get("hybrid_score")
+        row.reason = match["reason"]
+        row.scored_by = match.get("scored_by")
+        row.name = match["name"]
+        row.skills = match["skills"]
+        row.experience = str(match["experience"])
+        row.email = match["email"]
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+# Page through stored matches for a JD, best score first
+def page_matches(db: Session, jd, provider: str, model: str, scorer_version: str, offset: int = 0, limit: int = 20) -> dict:
+    query = _key_filter(db.query(MatchResult), jd, provider, model, scorer_version)
+    total = query.with_entities(func.count(MatchResult.id)).scalar()
+    rows = query.order_by(
+        MatchResult.score.is_(None), MatchResult.score.desc(), MatchResult.hybrid_score.desc(), MatchResult.id
+    ).offset(offset).limit(limit).all()
+    return {
+        "jd_id": jd.id,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "matches": [to_match(row) for row in rows]
+    }
+
+
+def _shortlist_rows(db: Session, jd) -> tuple[dict, list]:
+    rows = db.query(JDShortlist).filter(JDShortlist.jd_id == jd.id).all()
+    digest = jd_hash(jd)
+    return {row.candidate_id: row for row in rows if row.jd_hash == digest}, [row for row in rows if row.jd_hash != digest]
+
+# Lowest score still on a full shortlist; new candidates must beat it to get in
+def shortlist_floor(db: Session, jd, size: int = MATCH_SHORTLIST_SIZE):
+    current, _ = _shortlist_rows(db, jd)
+    if len(current) < size:
+        return None
+    return min(row.score for row in current.values())
+
+# Merge new matches into the JD's top-`size` shortlist; touches only the shortlist and the new rows.
+# An LLM score for a candidate is never replaced by a later hybrid-only score.
+def update_shortlist(db: Session, jd, matches: list, size: int = MATCH_SHORTLIST_SIZE):
+    matches = [m for m in matches if not m.get("error") and m.get("score") is not None]
+    if not matches:
+        return
+    current, stale = _shortlist_rows(db, jd)
+    entries = {cid: {"score": row.score, "scored_by": row.scored_by, "row": row} for cid, row in current.items()}
+    for match in matches:
+        existing = entries.get(match["candidate_id"])
+        if existing and existing["scored_by"] == "llm" and match.get("scored_by") != "llm":
+            continue
+        entries[match["candidate_id"]] = {"score": match["score"], "scored_by": match.get("scored_by"),
+                                          "row": existing["row"] if existing else None, "match": match}
+    keep = set(sorted(entries, key=lambda cid: -entries[cid]["score"])[:size])
+
+    for row in stale:
+        db.delete(row)
+    # Stale rows may share candidate ids with new ones; delete them before any inserts
+    db.flush()
+    for candidate_id, entry in entries.items():
+        row = entry["row"]
+        if candidate_id not in keep:
+            if row is not None:
+                db.delete(row)
+            continue
+        match = entry.get("match")
+        if match is None:
+            continue
+        if row is None:
+            row = JDShortlist(jd_id=jd.id, candidate_id=candidate_id)
+            db.add(row)
+        row.jd_hash = jd_hash(jd)
+        row.score = match["score"]
+        row.hybrid_score = match.get("hybrid_score")
+        row.reason = match["reason"]
+        row.scored_by = match.get("scored_by")
+        row.name = match["name"]
+        row.skills = match["skills"]
+        row.experience = str(match["experience"])
+        row.email = match["email"]
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+# The JD's materialized shortlist, best score first
+def get_shortlist(db: Session, jd) -> list:
+    current, _ = _shortlist_rows(db, jd)
+    rows = sorted(current.values(), key=lambda row: (-row.score, row.id))
+    return [to_match(row) for row in rows]
@@ -1,11 +1,69 @@
-from core.chroma_client import search_candidates
-from core.embeddings import generate_embedding
-from core.llm import get_llm
-from services.job_descriptions import get_jd_by_title
+from core.chroma_client import search_candidates, get_distance_space, get_candidates_by_ids, CANDIDATE_COLLECTION
+from core.embeddings import agenerate_embedding, agenerate_embeddings
+from core.similarity import cosine_similarities
+from core.skills import normalize_skills, skill_id
+from core.background import KeyedTaskPool
+from db.db import Session as SessionLocal
+from core import llm
+from core.llm_invoke import invoke_llm
+from services.job_descriptions import get_jd_by_title, get_jd_by_id
+from services.match_results import MATCH_RESULT_STORE_ENABLED, MATCH_SHORTLIST_SIZE, load_llm_matches, save_matches, shortlist_floor, update_shortlist
+from models.job_descriptions import JobDescription
 from langchain_core.messages import SystemMessage, HumanMessage
 from sqlalchemy.orm import Session
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import re
+import json
+import time
+import itertools
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Maximum scoring calls in flight at once per match request
+MATCH_SCORING_CONCURRENCY = int(os.getenv("MATCH_SCORING_CONCURRENCY", "8"))
+# "single" scores one candidate per LLM call; "batched" sends the JD once with up to
+# MATCH_SCORING_BATCH_SIZE candidates and asks for a JSON array of scores
+MATCH_SCORING_MODE = os.getenv("MATCH_SCORING_MODE", "single").lower()
+MATCH_SCORING_BATCH_SIZE = int(os.getenv("MATCH_SCORING_BATCH_SIZE", "5"))
+
+# Bump when prompts or score parsing change so stored LLM scores are not reused
+SCORER_VERSION = "1"
+
+# Every candidate first gets a local hybrid score; only the best MATCH_LLM_SHORTLIST_SIZE
+# (0 = all) at or above MATCH_LLM_MIN_HYBRID_SCORE are scored and explained by the LLM
+MATCH_LLM_SHORTLIST_SIZE = int(os.getenv("MATCH_LLM_SHORTLIST_SIZE", "10"))
+MATCH_LLM_MIN_HYBRID_SCORE = float(os.getenv("MATCH_LLM_MIN_HYBRID_SCORE", "0"))
+# Score newly ingested candidates against every JD and fold them into the JD shortlists.
+# New candidates reach the LLM only at or above MATCH_INCREMENTAL_MIN_HYBRID_SCORE and
+# only when they would enter the shortlist.
+MATCH_INCREMENTAL_ENABLED = os.getenv("MATCH_INCREMENTAL_ENABLED", "true").lower() == "true"
+MATCH_INCREMENTAL_MIN_HYBRID_SCORE = float(os.getenv("MATCH_INCREMENTAL_MIN_HYBRID_SCORE", "60"))
+# Re-matching runs in the background after ingestion returns; at most this many ingests at once / queued
+MATCH_INCREMENTAL_WORKERS = int(os.getenv("MATCH_INCREMENTAL_WORKERS", "1"))
+MATCH_INCREMENTAL_MAX_PENDING = int(os.getenv("MATCH_INCREMENTAL_MAX_PENDING", "16"))
+# New candidates' vectors are read back from the store this many at a time during re-matching
+MATCH_INCREMENTAL_PAGE_SIZE = int(os.getenv("MATCH_INCREMENTAL_PAGE_SIZE", "256"))
+# Speculatively match a JD in the background right after it is saved, so the first
+# /match/score for it is served from stored results
+MATCH_PREMATCH_ENABLED = os.getenv("MATCH_PREMATCH_ENABLED", "false").lower() == "true"
+MATCH_PREMATCH_WORKERS = int(os.getenv("MATCH_PREMATCH_WORKERS", "2"))
+MATCH_PREMATCH_MAX_PENDING = int(os.getenv("MATCH_PREMATCH_MAX_PENDING", "32"))
+MATCH_PREMATCH_N_RESULTS = int(os.getenv("MATCH_PREMATCH_N_RESULTS", "5"))
+# How long a match request waits for a running pre-match of the same JD
+MATCH_PREMATCH_WAIT_SECONDS = float(os.getenv("MATCH_PREMATCH_WAIT_SECONDS", "30"))
+
+_prematch_pool = KeyedTaskPool(max_workers=MATCH_PREMATCH_WORKERS, max_pending=MATCH_PREMATCH_MAX_PENDING)
+_rematch_pool = KeyedTaskPool(max_workers=MATCH_INCREMENTAL_WORKERS, max_pending=MATCH_INCREMENTAL_MAX_PENDING)
+_rematch_keys = itertools.count(1)
+# Relative weights of the hybrid score components; missing components are left out and the rest rescaled
+MATCH_HYBRID_WEIGHTS = {
+    "similarity": float(os.getenv("MATCH_HYBRID_WEIGHT_SIMILARITY", "0.5")),
+    "skill_overlap": float(os.getenv("MATCH_HYBRID_WEIGHT_SKILLS", "0.3")),
+    "experience_fit": float(os.getenv("MATCH_HYBRID_WEIGHT_EXPERIENCE", "0.2"))
+}
 
 # Match job description to candidates and generate match scores with explanations
 def cosine_similarity(vec1, vec2):
@@ -19,9 +77,7 @@ def cosine_similarity(vec1, vec2):
     Returns:
         Similarity score between 0 and 1
     """
-    vec1 = np.array(vec1).reshape(1, -1)
-    vec2 = np.array(vec2).reshape(1, -1)
-    return cosine_similarity(vec1, vec2)[0][0]
+    return float(cosine_similarities(vec1, np.asarray(vec2, dtype=np.float32)[None, :])[0])
 
 # Generate match score and reason for a candidate against a job description
 async def generate_reason(jd_text: str, candidate_metadata: dict, score: float) -> str:
@@ -49,47 +105,373 @@ async def generate_reason(jd_text: str, candidate_metadata: dict, score: float)
         Provide a brief, professional explanation (2-3 sentences) of the match quality.
         """
 
-        llm = get_llm()
         messages = [
             SystemMessage(content="You are an HR assistant explaining candidate-job matches."),
             HumanMessage(content=prompt)
         ]
-        response = await llm.ainvoke(messages)
-        return response.content.strip()
+        response = await invoke_llm(messages, call_site="generate_reason")
+        return response.strip()
 
     except Exception as e:
         return f"Match score of {score}% based on skills and experience alignment."
 
-# Main function to match job description to candidates and generate scores
-async def match_jd_to_candidates(title: str, n_results=5, db: Session = None) -> list:
+# Squared L2 between unit-length embeddings is 2 - 2 * cosine; the cosine and ip spaces return 1 - cosine
+def distance_to_similarity(distance: float, space: str = "l2") -> float:
+    similarity = 1 - distance / 2 if space == "l2" else 1 - distance
+    return min(1.0, max(0.0, similarity))
+
+# Canonical skill ids, so "ML" and "Machine Learning" count as the same skill
+def _skill_set(skills) -> set:
+    return {skill_id(skill) for skill in normalize_skills(skills)}
+
+# Fraction of the JD's required skills the candidate lists; None when the JD lists none
+def skill_overlap(required_skills, candidate_skills) -> float:
+    required = _skill_set(required_skills)
+    if not required:
+        return None
+    return len(required & _skill_set(candidate_skills)) / len(required)
+
+# "3-5 years" -> (3, 5), "5+ years" or "5 years" -> (5, None); None when no number is given
+def parse_experience_range(text: str):
+    numbers = [float(n) for n in re.findall(r"\d+(?:\.\d+)?", text or "")]
+    if not numbers:
+        return None
+    if len(numbers) == 1:
+        return numbers[0], None
+    return min(numbers[:2]), max(numbers[:2])
+
+# 1 inside the range; loses 0.25 per year short and 0.1 per year over (never below 0.5 when over)
+def experience_fit(years, experience_range: str) -> float:
+    bounds = parse_experience_range(experience_range)
+    if bounds is None or years is None:
+        return None
+    try:
+        years = float(years)
+    except (TypeError, ValueError):
+        return None
+    low, high = bounds
+    if years < low:
+        return max(0.0, 1 - 0.25 * (low - years))
+    if high is not None and years > high:
+        return max(0.5, 1 - 0.1 * (years - high))
+    return 1.0
+
+# Deterministic 0-100 score from vector similarity, skill overlap and experience fit
+def hybrid_score(jd, candidate_metadata: dict, distance: float = None, similarity: float = None) -> dict:
+    if similarity is None and distance is not None:
+        similarity = distance_to_similarity(distance, get_distance_space(CANDIDATE_COLLECTION))
+    components = {
+        "similarity": min(1.0, max(0.0, float(similarity))) if similarity is not None else None,
+        "skill_overlap": skill_overlap(getattr(jd, "required_skills", None), candidate_metadata.get('skills')),
+        "experience_fit": experience_fit(candidate_metadata.get('experience'), getattr(jd, "experience_range", None))
+    }
+    weighted = {name: MATCH_HYBRID_WEIGHTS[name] for name, value in components.items() if value is not None}
+    total = sum(weighted.values())
+    score = sum(components[name] * weight for name, weight in weighted.items()) / total * 100 if total else 0.0
+    return {"score": round(score), **{name: round(value, 3) if value is not None else None for name, value in components.items()}}
+
+def _hybrid_reason(hybrid: dict) -> str:
+    parts = []
+    if hybrid["similarity"] is not None:
+        parts.append(f"profile similarity {hybrid['similarity']:.0%}")
+    if hybrid["skill_overlap"] is not None:
+        parts.append(f"{hybrid['skill_overlap']:.0%} of required skills")
+    if hybrid["experience_fit"] is not None:
+        parts.append(f"experience fit {hybrid['experience_fit']:.0%}")
+    return "Not shortlisted for LLM review; hybrid score from " + (", ".join(parts) or "no comparable signals") + "."
+
+# Ranks (vector-search positions) of the best hybrid scores that qualify for LLM scoring
+def _shortlist(hybrids: list, shortlist_size: int, min_hybrid_score: float) -> set:
+    order = sorted(range(len(hybrids)), key=lambda rank: -hybrids[rank]["score"])
+    eligible = [rank for rank in order if hybrids[rank]["score"] >= min_hybrid_score]
+    return set(eligible[:shortlist_size] if shortlist_size > 0 else eligible)
+
+def _match_entry(rank: int, candidate_id: str, candidate_metadata: dict) -> dict:
+    return {
+        "rank": rank,
+        "candidate_id": candidate_id,
+        "name": candidate_metadata['name'],
+        "skills": candidate_metadata['skills'],
+        "experience": candidate_metadata['experience'],
+        "email": candidate_metadata['email']
+    }
+
+# Score one candidate on its own; a failed LLM call only affects this candidate
+async def _score_single(jd_text: str, rank: int, candidate_id: str, candidate_metadata: dict) -> dict:
+    match = _match_entry(rank, candidate_id, candidate_metadata)
+    try:
+        score, reason = await generate_match_score(jd_text, candidate_metadata)
+    except Exception as e:
+        logger.warning(f"Failed to score candidate {candidate_id}: {str(e)}")
+        return {**match, "score": None, "reason": f"Scoring failed: {str(e)}", "error": True}
+    return {**match, "score": score, "reason": reason}
+
+async def _score_single_limited(semaphore: asyncio.Semaphore, jd_text: str, *item) -> dict:
+    async with semaphore:
+        return await _score_single(jd_text, *item)
+
+# Score a chunk of (rank, candidate_id, metadata) in one call when batching, falling back
+# to single scoring for any candidate the batched response did not cover.
+# Every LLM call, batched or single, holds its own semaphore slot.
+async def _score_chunk(semaphore: asyncio.Semaphore, jd_text: str, chunk: list) -> list:
+    scored = {}
+    if len(chunk) > 1:
+        async with semaphore:
+            try:
+                scored = await generate_match_scores_batch(jd_text, [(cid, metadata) for _, cid, metadata in chunk])
+            except Exception as e:
+                logger.warning(f"Batched scoring failed, falling back to single scoring: {str(e)}")
+    missing = [item for item in chunk if item[1] not in scored]
+    fallback = await asyncio.gather(*(_score_single_limited(semaphore, jd_text, *item) for item in missing))
+    results = {match["candidate_id"]: match for match in fallback}
+    for rank, candidate_id, metadata in chunk:
+        if candidate_id in scored:
+            score, reason = scored[candidate_id]
+            results[candidate_id] = {**_match_entry(rank, candidate_id, metadata), "score": score, "reason": reason}
+    return [results[candidate_id] for _, candidate_id, _ in chunk]
+
+def _chunks(items: list, mode: str, batch_size: int) -> list:
+    size = max(1, batch_size) if mode == "batched" else 1
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+# Candidates closest to a job description as (ids, metadatas, distances)
+async def _search_for_jd(jd, n_results: int) -> tuple:
+    jd_embedding = await agenerate_embedding(jd.job_description)
+    candidate_results = await asyncio.to_thread(search_candidates, jd_embedding, n_results)
+    if not candidate_results['ids']:
+        return [], [], []
+    distances = (candidate_results.get('distances') or [[]])[0] or [None] * len(candidate_results['ids'][0])
+    return candidate_results['ids'][0], candidate_results['metadatas'][0], distances
+
+# Look up the job description and the candidates closest to it
+async def find_candidates_for_jd(title: str, n_results: int, db: Session = None) -> tuple:
     jd = get_jd_by_title(title, db)
     if not jd:
         raise ValueError(f"Job description with title containing '{title}' not found")
-    
-    jd_text = jd.job_description
-    # Find matching candidates
-    jd_embedding = generate_embedding(jd_text)
-    candidate_results = search_candidates(jd_embedding, n_results)
-
-    matches = []
-    if candidate_results['ids']:
-        ids = candidate_results['ids'][0]
-        metadatas = candidate_results['metadatas'][0]
-        distances = candidate_results['distances'][0] if 'distances' in candidate_results and candidate_results['distances'] else [None] * len(ids)
-        for i in range(len(ids)):
-            candidate_metadata = metadatas[i]
-            score, reason = await generate_match_score(jd_text, candidate_metadata)
-            matches.append({
-                "candidate_id": ids[i],
-                "name": candidate_metadata['name'],
-                "skills": candidate_metadata['skills'],
-                "experience": candidate_metadata['experience'],
-                "email": candidate_metadata['email'],
-                "score": score,
-                "reason": reason
-            })
-
-    return matches
+
+    # Let a running pre-match for this JD finish so its stored scores are reused
+    await _prematch_pool.wait(jd.id, MATCH_PREMATCH_WAIT_SECONDS)
+    return (jd, *await _search_for_jd(jd, n_results))
+
+# Match entry for a candidate that keeps its hybrid score instead of going to the LLM
+def _hybrid_entry(rank: int, candidate_id: str, candidate_metadata: dict, hybrid: dict) -> dict:
+    return {
+        **_match_entry(rank, candidate_id, candidate_metadata),
+        "score": hybrid["score"],
+        "reason": _hybrid_reason(hybrid),
+        "hybrid_score": hybrid["score"],
+        "scored_by": "hybrid"
+    }
+
+# Hybrid-score every candidate; returns the finished entries for candidates left off the LLM
+# shortlist or already scored in `stored`, the (rank, candidate_id, metadata) items still to
+# score with the LLM, and the hybrid scores
+def _plan_matches(jd, ids: list, metadatas: list, distances: list, shortlist_size: int, min_hybrid_score: float,
+                  stored: dict = None) -> tuple:
+    stored = stored or {}
+    hybrids = [hybrid_score(jd, metadatas[rank], distances[rank]) for rank in range(len(ids))]
+    shortlist = _shortlist(hybrids, shortlist_size, min_hybrid_score)
+    local, llm_items = [], []
+    for rank in range(len(ids)):
+        if rank in shortlist and ids[rank] in stored:
+            row = stored[ids[rank]]
+            local.append({**_match_entry(rank, ids[rank], metadatas[rank]), "score": row.score, "reason": row.reason,
+                          "hybrid_score": hybrids[rank]["score"], "scored_by": "llm", "cached": True})
+        elif rank in shortlist:
+            llm_items.append((rank, ids[rank], metadatas[rank]))
+        else:
+            local.append(_hybrid_entry(rank, ids[rank], metadatas[rank], hybrids[rank]))
+    return local, llm_items, hybrids
+
+def _with_hybrid(match: dict, hybrids: list) -> dict:
+    return {**match, "hybrid_score": hybrids[match["rank"]]["score"], "scored_by": "llm"}
+
+# Stored results are an optimization: a database problem must not fail the match itself
+def _load_stored(db: Session, jd, ids: list) -> dict:
+    if db is None or not MATCH_RESULT_STORE_ENABLED:
+        return {}
+    try:
+        return load_llm_matches(db, jd, ids, llm.current_provider, llm.current_model, SCORER_VERSION)
+    except Exception as e:
+        logger.warning(f"Failed to load stored matches: {str(e)}")
+        return {}
+
+def _store(db: Session, jd, matches: list):
+    if db is None or not MATCH_RESULT_STORE_ENABLED:
+        return
+    try:
+        save_matches(db, jd, matches, llm.current_provider, llm.current_model, SCORER_VERSION)
+        update_shortlist(db, jd, matches)
+    except Exception as e:
+        logger.warning(f"Failed to store matches: {str(e)}")
+
+# Score the searched candidates for a JD, reusing stored LLM scores and writing new ones through
+async def _score_matches(jd, ids: list, metadatas: list, distances: list, db: Session, concurrency: int, mode: str,
+                         batch_size: int, shortlist_size: int, min_hybrid_score: float) -> list:
+    stored = _load_stored(db, jd, ids)
+    local, llm_items, hybrids = _plan_matches(jd, ids, metadatas, distances, shortlist_size, min_hybrid_score, stored)
+    # Score shortlisted chunks concurrently, then restore the vector-search order
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    chunks = await asyncio.gather(*(
+        _score_chunk(semaphore, jd.job_description, chunk) for chunk in _chunks(llm_items, mode, batch_size)
+    ))
+    matches = local + [_with_hybrid(match, hybrids) for chunk in chunks for match in chunk]
+    _store(db, jd, matches)
+    return sorted(matches, key=lambda match: match["rank"])
+
+# Main function to match job description to candidates and generate scores
+async def match_jd_to_candidates(title: str, n_results=5, db: Session = None, concurrency: int = MATCH_SCORING_CONCURRENCY,
+                                 mode: str = MATCH_SCORING_MODE, batch_size: int = MATCH_SCORING_BATCH_SIZE,
+                                 shortlist_size: int = MATCH_LLM_SHORTLIST_SIZE, min_hybrid_score: float = MATCH_LLM_MIN_HYBRID_SCORE) -> list:
+    jd, ids, metadatas, distances = await find_candidates_for_jd(title, n_results, db)
+    return await _score_matches(jd, ids, metadatas, distances, db, concurrency, mode, batch_size, shortlist_size, min_hybrid_score)
+
+# Background match for a freshly saved JD, using its own session since the request's is gone by then
+async def prematch_jd(jd_id: int):
+    db = SessionLocal()
+    try:
+        jd = get_jd_by_id(jd_id, db)
+        if not jd:
+            return
+        ids, metadatas, distances = await _search_for_jd(jd, MATCH_PREMATCH_N_RESULTS)
+        await _score_matches(jd, ids, metadatas, distances, db, MATCH_SCORING_CONCURRENCY, MATCH_SCORING_MODE,
+                             MATCH_SCORING_BATCH_SIZE, MATCH_LLM_SHORTLIST_SIZE, MATCH_LLM_MIN_HYBRID_SCORE)
+    finally:
+        db.close()
+
+# Queue a pre-match for a JD that was just saved or edited, replacing any queued or running one
+def schedule_prematch(jd_id: int) -> bool:
+    if not MATCH_PREMATCH_ENABLED or not MATCH_RESULT_STORE_ENABLED:
+        return False
+    return _prematch_pool.submit(jd_id, lambda: prematch_jd(jd_id))
+
+def cancel_prematch(jd_id: int) -> bool:
+    return _prematch_pool.cancel(jd_id)
+
+def cancel_all_prematches():
+    _prematch_pool.cancel_all()
+
+def get_prematch_stats() -> dict:
+    return {"enabled": MATCH_PREMATCH_ENABLED, **_prematch_pool.stats()}
+
+# Yield hybrid-only and stored matches at once, then each LLM-scored match as soon as its chunk is ready.
+# Matches arrive in completion order; "rank" is the candidate's vector-search position.
+async def stream_match_jd_to_candidates(jd, ids: list, metadatas: list, distances: list, db: Session = None,
+                                        concurrency: int = MATCH_SCORING_CONCURRENCY,
+                                        mode: str = MATCH_SCORING_MODE, batch_size: int = MATCH_SCORING_BATCH_SIZE,
+                                        shortlist_size: int = MATCH_LLM_SHORTLIST_SIZE, min_hybrid_score: float = MATCH_LLM_MIN_HYBRID_SCORE):
+    stored = _load_stored(db, jd, ids)
+    local, llm_items, hybrids = _plan_matches(jd, ids, metadatas, distances, shortlist_size, min_hybrid_score, stored)
+    _store(db, jd, local)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks = [asyncio.ensure_future(_score_chunk(semaphore, jd.job_description, chunk)) for chunk in _chunks(llm_items, mode, batch_size)]
+    try:
+        for match in local:
+            yield match
+        for next_done in asyncio.as_completed(tasks):
+            chunk = [_with_hybrid(match, hybrids) for match in await next_done]
+            _store(db, jd, chunk)
+            for match in chunk:
+                yield match
+    finally:
+        # The client disconnected or the consumer stopped early: stop paying for LLM calls
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+_incremental_stats = {"runs": 0, "candidates": 0, "jd_pairs": 0, "llm_scored": 0, "seconds": 0.0}
+
+# Match one JD against a batch of new candidates given their precomputed similarities.
+# Each JD gets its own session: the JD re-matches run concurrently and one session must not be shared.
+async def _rematch_jd(semaphore: asyncio.Semaphore, jd, candidate_ids: list, metadatas: list, similarities,
+                      mode: str, batch_size: int, min_hybrid_score: float) -> int:
+    db = SessionLocal()
+    try:
+        hybrids = [hybrid_score(jd, metadatas[i], similarity=similarities[i]) for i in range(len(candidate_ids))]
+        floor = shortlist_floor(db, jd, MATCH_SHORTLIST_SIZE)
+        # Only candidates that could enter the shortlist are worth an LLM call
+        eligible = [i for i in range(len(candidate_ids))
+                    if hybrids[i]["score"] >= min_hybrid_score and (floor is None or hybrids[i]["score"] > floor)]
+        eligible = set(sorted(eligible, key=lambda i: -hybrids[i]["score"])[:MATCH_SHORTLIST_SIZE])
+        local = [_hybrid_entry(i, candidate_ids[i], metadatas[i], hybrids[i]) for i in range(len(candidate_ids)) if i not in eligible]
+        llm_items = [(i, candidate_ids[i], metadatas[i]) for i in sorted(eligible)]
+        chunks = await asyncio.gather(*(
+            _score_chunk(semaphore, jd.job_description, chunk) for chunk in _chunks(llm_items, mode, batch_size)
+        ))
+        _store(db, jd, local + [_with_hybrid(match, hybrids) for chunk in chunks for match in chunk])
+        return len(llm_items)
+    finally:
+        db.close()
+
+async def rematch_new_candidates(candidate_ids: list, db: Session = None,
+                                 concurrency: int = MATCH_SCORING_CONCURRENCY, mode: str = MATCH_SCORING_MODE,
+                                 batch_size: int = MATCH_SCORING_BATCH_SIZE,
+                                 min_hybrid_score: float = MATCH_INCREMENTAL_MIN_HYBRID_SCORE,
+                                 page_size: int = MATCH_INCREMENTAL_PAGE_SIZE) -> dict:
+    """
+    Score newly ingested candidates against every stored JD and update each JD's shortlist.
+
+    JDs are loaded and embedded once; the new candidates' vectors are read
+    back from the store a page at a time, so memory stays bounded by the page
+    and the cost grows with the ingested batch, not the pool.
+
+    Args:
+        candidate_ids: Ids of the candidates just written to the store
+        db: Session the JDs are loaded with; without one, a session is opened and closed here
+        page_size: Candidates read back and matched per pass
+
+    Returns:
+        Counts of JDs, candidates and LLM-scored pairs
+    """
+    if db is None:
+        db = SessionLocal()
+        try:
+            return await rematch_new_candidates(candidate_ids, db, concurrency, mode, batch_size, min_hybrid_score,
+                                                page_size)
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    jds = db.query(JobDescription).all()
+    if not jds or not candidate_ids:
+        return {"jds": len(jds), "candidates": len(candidate_ids), "llm_scored": 0}
+    jd_vectors = await agenerate_embeddings([jd.job_description or "" for jd in jds])
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    matched, llm_scored = 0, 0
+    for offset in range(0, len(candidate_ids), max(1, page_size)):
+        page = await asyncio.to_thread(get_candidates_by_ids, candidate_ids[offset:offset + page_size])
+        if not page["ids"]:
+            continue
+        similarities = cosine_similarities(jd_vectors, page["embeddings"])
+        scored = await asyncio.gather(*(
+            _rematch_jd(semaphore, jd, page["ids"], page["metadatas"], similarities[j], mode, batch_size, min_hybrid_score)
+            for j, jd in enumerate(jds)
+        ))
+        matched += len(page["ids"])
+        llm_scored += sum(scored)
+    _incremental_stats["runs"] += 1
+    _incremental_stats["candidates"] += matched
+    _incremental_stats["jd_pairs"] += len(jds) * matched
+    _incremental_stats["llm_scored"] += llm_scored
+    _incremental_stats["seconds"] += time.perf_counter() - start
+    return {"jds": len(jds), "candidates": matched, "llm_scored": llm_scored}
+
+# Re-match one ingest's candidates in the background with its own session, so ingestion does not wait
+# for LLM scoring. Only ids are held; vectors are re-read from the store, so JDs are embedded once per ingest.
+def schedule_rematch(candidate_ids: list) -> bool:
+    if not MATCH_INCREMENTAL_ENABLED or not candidate_ids:
+        return False
+    scheduled = _rematch_pool.submit(next(_rematch_keys), lambda: rematch_new_candidates(candidate_ids))
+    if not scheduled:
+        logger.warning(f"Incremental re-matching queue is full; {len(candidate_ids)} new candidates were not re-matched")
+    return scheduled
+
+def cancel_all_rematches():
+    _rematch_pool.cancel_all()
+
+def get_incremental_match_stats() -> dict:
+    return {"enabled": MATCH_INCREMENTAL_ENABLED, **_incremental_stats, "seconds": round(_incremental_stats["seconds"], 3),
+            "pool": _rematch_pool.stats()}
 
 # Generate match score and reason for a candidate against a job description
 async def generate_match_score(jd_text: str, candidate_metadata: dict) -> tuple[int, str]:
@@ -104,19 +486,85 @@ async def generate_match_score(jd_text: str, candidate_metadata: dict) -> tuple[
 
     Return in format: Score: X% Reason: explanation
     """
-    llm = get_llm()
     messages = [
         SystemMessage(content="You are an HR assistant that evaluates candidate-job matches."),
         HumanMessage(content=prompt)
     ]
-    response = await llm.ainvoke(messages)
-    result = response.content.strip()
-    # Parse score and reason
+    response = await invoke_llm(messages, call_site="generate_match_score", validate=_is_match_score_reply)
+    result = response.strip()
+    # An unparseable reply is an error, never a made-up score; callers leave the candidate unscored
+    try:
+        return _parse_match_score(result)
+    except ValueError:
+        logger.warning(f"Unparseable match score reply: {result!r}")
+        raise ValueError("Unparseable match score reply")
+
+# Parse a "Score: X% Reason: explanation" reply
+def _parse_match_score(text: str) -> tuple:
+    score_part, reason_part = text.split("Reason:", 1)
+    score = int(score_part.replace("Score:", "").replace("%", "").strip())
+    if not 0 <= score <= 100:
+        raise ValueError(f"Match score {score} out of range")
+    return score, reason_part.strip()
+
+def _is_match_score_reply(text: str) -> bool:
+    try:
+        _parse_match_score(text.strip())
+        return True
+    except ValueError:
+        return False
+
+def _candidate_profile(candidate_id: str, candidate_metadata: dict) -> str:
+    return f"- candidate_id: {candidate_id}, Name: {candidate_metadata['name']}, Skills: {candidate_metadata['skills']}, Experience: {candidate_metadata['experience']} years"
+
+# Pull the first JSON array out of a response that may wrap it in prose or code fences
+def _parse_score_array(text: str) -> list:
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if not match:
+        raise ValueError("No JSON array in batched scoring response")
+    items = json.loads(match.group(0))
+    if not isinstance(items, list):
+        raise ValueError("Batched scoring response is not a JSON array")
+    return items
+
+def _is_score_array_reply(text: str) -> bool:
     try:
-        score_part, reason_part = result.split("Reason:", 1)
-        score = int(score_part.replace("Score:", "").replace("%", "").strip())
-        reason = reason_part.strip()
-    except:
-        score = 50
-        reason = result
-    return score, reason
\ No newline at end of file
+        _parse_score_array(text.strip())
+        return True
+    except ValueError:
+        return False
+
+# Score several candidates against one job description in a single LLM call.
+# Returns {candidate_id: (score, reason)} for the items that parsed; callers score the rest one by one.
+async def generate_match_scores_batch(jd_text: str, candidates: list) -> dict:
+    profiles = "\n".join(_candidate_profile(cid, metadata) for cid, metadata in candidates)
+    prompt = f"""
+    Compare the following job description with each candidate profile.
+    For every candidate, generate a match score from 0 to 100 and a brief explanation.
+
+    Job Description: {jd_text}
+
+    Candidates:
+    {profiles}
+
+    Return only a JSON array with one object per candidate, in this format:
+    [{{"candidate_id": "...", "score": X, "reason": "explanation"}}]
+    """
+    messages = [
+        SystemMessage(content="You are an HR assistant that evaluates candidate-job matches."),
+        HumanMessage(content=prompt)
+    ]
+    response = await invoke_llm(messages, call_site="generate_match_scores_batch", validate=_is_score_array_reply)
+    expected = {str(cid) for cid, _ in candidates}
+    scores = {}
+    for item in _parse_score_array(response.strip()):
+        # Skip malformed items individually so one bad entry does not discard the batch
+        try:
+            candidate_id = str(item["candidate_id"])
+            score = int(float(str(item["score"]).replace("%", "").strip()))
+            reason = str(item.get("reason", "")).strip()
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        if candidate_id in expected and 0 <= score <= 100 and candidate_id not in scores:
+            scores[candidate_id] = (score, reason)
+    return scores
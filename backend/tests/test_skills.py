@@ -0,0 +1,25 @@
+from core.skills import find_skills_in_text
+
+
+def test_capitalized_abbreviation_is_not_a_skill_in_prose():
+    assert find_skills_in_text("Please send your CV") == []
+    assert find_skills_in_text("Please send your CV and cover letter") == []
+
+
+def test_abbreviation_in_skill_list_or_role_is_a_skill():
+    assert "Computer Vision" in find_skills_in_text("Python, CV and NLP")
+    assert find_skills_in_text("CV engineer") == ["Computer Vision"]
+    assert "TypeScript" in find_skills_in_text("TS or JavaScript")
+
+
+def test_sentence_start_skill_followed_by_role_word():
+    assert find_skills_in_text("Go developers needed") == ["Go"]
+
+
+def test_everyday_word_is_not_a_skill():
+    assert find_skills_in_text("Ready to go") == []
+    assert find_skills_in_text("We need someone with Go") == ["Go"]
+
+
+def test_ambiguous_aliases_count_when_requested():
+    assert find_skills_in_text("Please send your CV", include_ambiguous=True) == ["Computer Vision"]
@@ -3,7 +3,7 @@ from langchain_core.messages import SystemMessage, HumanMessage
 import fitz
 import docx
 from io import BytesIO
-from core.llm import get_llm
+from core.llm_invoke import invoke_llm, is_json_reply, strip_json_fence
 
 # Extract text from uploaded file based on content type
 async def extract_text_from_file(file_bytes: bytes, content_type: str, filename: str = None) -> str:
@@ -48,19 +48,12 @@ async def generate_structured_jd(text: str) -> dict:
     Ensure the job_description is compelling, professional, and includes all relevant details from the provided information. Make it at least 300 words long with proper structure.
     Return only the JSON, no additional text or explanations.
     """
-    llm = get_llm()
     messages = [
         SystemMessage(content="You are an expert HR assistant that creates professional job descriptions. Always respond with valid JSON only."),
         HumanMessage(content=prompt)
     ]
-    response = await llm.ainvoke(messages)
-    result = response.content.strip()
-    
-    if result.startswith('```json'):
-        result = result[7:]
-    if result.endswith('```'):
-        result = result[:-3]
-    result = result.strip()
+    response = await invoke_llm(messages, call_site="generate_structured_jd", validate=is_json_reply)
+    result = strip_json_fence(response)
     try:
         data = json.loads(result)
         return data
@@ -371,6 +371,7 @@
 
 import streamlit as st
 import requests
+import json
 from concurrent.futures import ThreadPoolExecutor
 
 API_BASE = "http://127.0.0.1:8000"
@@ -749,12 +750,38 @@ elif menu == "Match & Score":
 
     if st.button("Run Matching"):
         payload = {"title": selected_title, "n_results": 5}
-        res = requests.post(f"{API_BASE}/match/score", json=payload)
+        st.session_state.pop("matches", None)
+        # Stream matches so each candidate shows up as soon as it is scored
+        res = requests.post(f"{API_BASE}/match/score/stream", json=payload, stream=True)
         if res.status_code == 200:
-            matches = res.json().get("matches", [])
+            matches = []
+            summary = None
+            progress = st.empty()
+            event = None
+            for line in res.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    if event == "match":
+                        matches.append(data)
+                        matches.sort(key=lambda m: m["rank"])
+                        with progress.container():
+                            st.info(f"Scored {len(matches)} of {payload['n_results']} candidates...")
+                            for match in matches:
+                                score_label = f"{match['score']}/100" if match.get('score') is not None else "not scored"
+                                st.write(f"👤 **{match['name']}** - Score: {score_label}")
+                    elif event == "summary":
+                        summary = data
+                    elif event == "error":
+                        st.error(f"Matching stopped early: {data.get('detail', 'Unknown error')}")
+            progress.empty()
             st.session_state["matches"] = matches
             st.session_state["selected_jd"] = selected_title
-            st.success(f"Found {len(matches)} matches")
+            if summary and summary.get("failed"):
+                st.warning(f"Found {len(matches)} matches ({summary['failed']} could not be scored)")
+            else:
+                st.success(f"Found {len(matches)} matches")
         else:
             error_detail = res.json().get("detail", "Unknown error")
             st.error(f"Failed to run matching: {error_detail}")
@@ -762,12 +789,15 @@ elif menu == "Match & Score":
     if "matches" in st.session_state:
         st.subheader("Matched Candidates")
         for i, match in enumerate(st.session_state["matches"]):
-            with st.expander(f"👤 {match['name']} - Score: {match['score']}/100"):
+            score_label = f"{match['score']}/100" if match.get('score') is not None else "not scored"
+            with st.expander(f"👤 {match['name']} - Score: {score_label}"):
                 col1, col2 = st.columns([3, 1])
                 with col1:
                     st.write(f"**Skills:** {match['skills']}")
                     st.write(f"**Experience:** {match['experience']}")
                     st.write(f"**Reason:** {match['reason']}")
+                    if match.get("scored_by") == "hybrid":
+                        st.caption("Scored locally (not shortlisted for LLM review)")
                     st.write(f"**Email:** {match.get('email', 'N/A')}")
                 with col2:
                     if st.button(f"Send Email to {match['name']}", key=f"email_{i}"):